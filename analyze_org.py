@@ -4,29 +4,39 @@ O9NN Organization Analysis Script
 Analyzes organization structure, repository health, and generates insights.
 """
 
-import json
-import os
+import argparse
 import sys
-from datetime import datetime
-from collections import defaultdict
 from pathlib import Path
 
+import org_json
+from org_metrics import MetricsRecorder
+from org_profiles import CATEGORIES, RepositoryCategorizer, load_profile
+from org_stream import AGGREGATES, SnapshotFormatError, summarize_snapshot
+
 # Get script directory for relative paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 RAW_DATA_FILE = SCRIPT_DIR / 'org-graph-raw.json'
 OUTPUT_FILE = SCRIPT_DIR / 'analysis_output.txt'
 
 
-def load_organization_data(filepath):
-    """Load organization data from JSON file."""
+def load_organization_summary(filepath, aggregates=AGGREGATES):
+    """
+    Stream organization data from a JSON file and aggregate it in one pass.
+
+    Repository nodes are decoded one at a time from a memory-mapped file, so
+    memory use stays bounded regardless of snapshot size.
+
+    Returns:
+        Tuple of (organization fields, summary dictionary)
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        return summarize_snapshot(filepath, aggregates=aggregates,
+                                  categorizer=lambda organization: RepositoryCategorizer(organization=organization),
+                                  required_fields=OVERVIEW_FIELDS)
     except FileNotFoundError:
         print(f"Error: File not found: {filepath}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except SnapshotFormatError as e:
         print(f"Error: Invalid JSON in {filepath}: {e}")
         sys.exit(1)
     except Exception as e:
@@ -34,187 +44,302 @@ def load_organization_data(filepath):
         sys.exit(1)
 
 
-def analyze_organization(data):
-    """Perform comprehensive organization analysis."""
-    try:
-        org = data['data']['organization']
-        repos = org['repositories']['nodes']
-    except KeyError as e:
-        print(f"Error: Missing expected key in data structure: {e}")
-        sys.exit(1)
+# Report sections in output order
+SECTIONS = ['overview', 'languages', 'categories', 'health', 'activity', 'recommendations']
 
-    # Basic statistics
-    print("=" * 80)
-    print("O9NN ORGANIZATION ANALYSIS")
-    print("=" * 80)
-    print(f"\nOrganization: {org.get('name', 'N/A')}")
-    print(f"Login: {org.get('login', 'N/A')}")
-    print(f"URL: {org.get('url', 'N/A')}")
-    print(f"Created: {org.get('createdAt', 'N/A')}")
-    print(f"Total Repositories: {org['repositories'].get('totalCount', 0)}")
-    print(f"Total Members: {org['membersWithRole'].get('totalCount', 0)}")
-
-    # Language distribution
-    language_counts = defaultdict(int)
-    for repo in repos:
-        if repo.get('primaryLanguage'):
-            language_counts[repo['primaryLanguage']['name']] += 1
+# Organization fields read by the overview section
+OVERVIEW_FIELDS = ('name', 'login', 'url', 'createdAt', 'membersWithRole.totalCount', 'repositories.totalCount')
 
-    print("\n" + "=" * 80)
-    print("LANGUAGE DISTRIBUTION")
-    print("=" * 80)
-    for lang, count in sorted(language_counts.items(), key=lambda x: x[1], reverse=True):
-        print(f"{lang}: {count} repositories")
+# Repository aggregates (see org_stream.AGGREGATES) each section depends on
+SECTION_AGGREGATES = {
+    'overview': (),
+    'languages': ('languages',),
+    'categories': ('categories',),
+    'health': ('health',),
+    'activity': ('activity',),
+    'recommendations': ('categories', 'health', 'languages'),
+}
 
-    # Repository categories
-    print("\n" + "=" * 80)
-    print("REPOSITORY CATEGORIES")
-    print("=" * 80)
+# Languages counted as low-level implementations in the recommendations
+SYSTEMS_LANGUAGES = ('C', 'C++', 'Rust', 'Zig', 'Go')
 
-    categories = {
-        'Core Libraries': [],
-        'Infrastructure': [],
-        'Tools & CLI': [],
-        'Web & API': [],
-        'Data & Models': [],
-        'Documentation': [],
-        'Testing & Benchmarking': [],
-        'Deployment & Cloud': [],
-        'Experimental': [],
-        'Integrations': [],
-        'Mobile & Desktop': [],
-        'Forked Projects': [],
-        'Organization': []
-    }
-
-    # Categorize repositories
-    for repo in repos:
-        name = repo.get('name', '')
-        is_fork = repo.get('isFork', False)
-        
-        if is_fork:
-            categories['Forked Projects'].append(name)
-        elif name == 'org-o9nn':
-            categories['Organization'].append(name)
-        elif name in ['cogpy', 'cogplan9', 'cogpilot.jl', 'cognu-mach', 'coglux', 'coglow', 'coggml', 'cogmetal', 'cogwhisper', 'cogllama', 'cogtorch', 'cogllm', 'nnpu']:
-            categories['Core Libraries'].append(name)
-        elif name in ['coginfra', 'cogci', 'cogmonitor', 'cogconfig', 'cogdeploy']:
-            categories['Infrastructure'].append(name)
-        elif name in ['cogcli', 'cogtools', 'cogscripts']:
-            categories['Tools & CLI'].append(name)
-        elif name in ['cogweb', 'cogapi', 'cogserve']:
-            categories['Web & API'].append(name)
-        elif name in ['cogdata', 'cogmodels', 'coglearn', 'cogtrain', 'cogeval']:
-            categories['Data & Models'].append(name)
-        elif name in ['cogdocs', 'cogpapers', 'cogresearch', 'cognotebooks', 'cogexamples']:
-            categories['Documentation'].append(name)
-        elif name in ['cogbench', 'cogtests']:
-            categories['Testing & Benchmarking'].append(name)
-        elif name in ['cogcloud']:
-            categories['Deployment & Cloud'].append(name)
-        elif name in ['cogexp', 'cogproto', 'cogsandbox', 'cogplayground']:
-            categories['Experimental'].append(name)
-        elif name in ['cogintegrations', 'cogconnectors', 'cogadapters', 'cogbridge', 'cogsdk', 'cogclient', 'cogplugins', 'cogextensions']:
-            categories['Integrations'].append(name)
-        elif name in ['cogmobile', 'cogdesktop']:
-            categories['Mobile & Desktop'].append(name)
-        elif name in ['cogassets', 'cogmedia', 'cogbrand', 'cogarchive', 'coglegacy', 'cogviz']:
-            categories['Documentation'].append(name)
-
-    for category, repos_list in categories.items():
-        if repos_list:
-            print(f"\n{category} ({len(repos_list)}):")
-            for repo in sorted(repos_list):
-                print(f"  - {repo}")
+# Categories that show a separation of operational concerns: (key, label)
+OPERATIONS_CATEGORIES = (
+    ('infrastructure', 'infrastructure'),
+    ('testing_benchmarking', 'testing'),
+    ('deployment_cloud', 'deployment'),
+)
 
-    # Repository health metrics
-    print("\n" + "=" * 80)
-    print("REPOSITORY HEALTH METRICS")
-    print("=" * 80)
 
-    repos_with_desc = sum(1 for r in repos if r.get('description'))
-    repos_without_desc = len(repos) - repos_with_desc
-    forked_repos = sum(1 for r in repos if r.get('isFork', False))
-    original_repos = len(repos) - forked_repos
-    archived_repos = sum(1 for r in repos if r.get('isArchived', False))
-    private_repos = sum(1 for r in repos if r.get('isPrivate', False))
-
-    print(f"\nRepositories with descriptions: {repos_with_desc}/{len(repos)} ({repos_with_desc/len(repos)*100:.1f}%)")
-    print(f"Repositories without descriptions: {repos_without_desc}/{len(repos)} ({repos_without_desc/len(repos)*100:.1f}%)")
-    print(f"Original repositories: {original_repos}")
-    print(f"Forked repositories: {forked_repos}")
-    print(f"Archived repositories: {archived_repos}")
-    print(f"Private repositories: {private_repos}")
-
-    # Recent activity
-    print("\n" + "=" * 80)
-    print("RECENT ACTIVITY (Last 30 days)")
-    print("=" * 80)
+def parse_sections(value):
+    """
+    Parse a comma-separated section list.
+
+    Args:
+        value: String such as "languages,health" or "all"
+
+    Returns:
+        List of section names in report order
+    """
+    if not value or value == 'all':
+        return list(SECTIONS)
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(sorted(unknown))} (choose from {', '.join(SECTIONS)})")
+    return [name for name in SECTIONS if name in requested]
+
+
+def required_aggregates(sections):
+    """Return the repository aggregates needed to build the given sections."""
+    return tuple(sorted({agg for section in sections for agg in SECTION_AGGREGATES[section]}))
+
+
+def build_recommendations(summary, login=None, profile=None):
+    """
+    Return the improvement recommendations as a list of (title, items) pairs.
+
+    Args:
+        summary: Aggregated statistics from summarize_repositories
+        login: Organization login, used to name the meta repository
+        profile: Organization profile from org_profiles.load_profile
+    """
+    profile = profile or {}
+    repos_without_desc = summary['total'] - summary['with_description']
 
-    now = datetime.now()
-    recent_repos = []
-    for repo in repos:
-        updated_at = repo.get('updatedAt')
-        if updated_at:
-            try:
-                updated = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                days_ago = (now - updated.replace(tzinfo=None)).days
-                if days_ago <= 30:
-                    recent_repos.append((repo.get('name', 'Unknown'), days_ago))
-            except (ValueError, AttributeError):
-                continue
-
-    recent_repos.sort(key=lambda x: x[1])
-    if recent_repos:
-        for name, days in recent_repos[:10]:
-            print(f"  - {name} (updated {days} days ago)")
+    prefix = profile.get('prefix')
+    if prefix:
+        naming = [
+            f"All repositories follow '{prefix}*' naming pattern (good consistency)",
+            f"Consider adding prefixes for different categories (e.g., '{prefix}-core-*', '{prefix}-tools-*')",
+        ]
     else:
-        print("  No repositories updated in the last 30 days")
+        naming = [
+            "No shared repository naming prefix",
+            "Consider a consistent naming scheme with category prefixes (e.g., 'core-*', 'tools-*')",
+        ]
+    forks = f"{summary['forked']} forked repositories"
+    if profile.get('fork_note'):
+        forks += f" ({profile['fork_note']})"
 
-    # Recommendations
-    print("\n" + "=" * 80)
-    print("RECOMMENDATIONS FOR IMPROVEMENT")
+    languages = []
+    language_counts = summary['language_counts']
+    if language_counts:
+        top, count = max(language_counts.items(), key=lambda x: x[1])
+        share = count / summary['total'] * 100 if summary['total'] else 0
+        languages.append(f"Largest language: {top} ({count} repositories, {share:.0f}%)")
+    systems = [lang for lang in SYSTEMS_LANGUAGES if language_counts.get(lang)]
+    if len(systems) > 1:
+        languages.append(f"Multiple low-level implementations ({', '.join(systems)})")
+        languages.append("Consider consolidating similar implementations")
+    elif systems:
+        languages.append(f"Low-level implementations in {systems[0]}")
+
+    categories = summary['categories']
+    present = [f"{label} ({len(categories[key])})" for key, label in OPERATIONS_CATEGORIES if categories.get(key)]
+    missing = [label for key, label in OPERATIONS_CATEGORIES if not categories.get(key)]
+    operations = []
+    if present:
+        operations.append(f"Dedicated repositories for {', '.join(present)}")
+    if missing:
+        missing_text = ' or '.join(missing) if len(missing) < 3 else f"{', '.join(missing[:-1])} or {missing[-1]}"
+        operations.append(f"No dedicated {missing_text} repositories")
+
+    return [
+        ('DOCUMENTATION GAPS', [
+            f"{repos_without_desc} repositories lack descriptions",
+            "Add clear, concise descriptions to all repositories",
+            "Ensure README files exist in all active repositories",
+        ]),
+        ('REPOSITORY ORGANIZATION', [
+            "Consider archiving unused experimental repositories",
+            "Add topics/tags to repositories for better discoverability",
+            f"Create a comprehensive organization README (org-{login or '<login>'})",
+        ]),
+        ('NAMING CONVENTIONS', naming),
+        ('LANGUAGE ECOSYSTEM', languages or ["No primary languages detected"]),
+        ('INTEGRATION & DEPLOYMENT', operations + [
+            "Ensure CI/CD pipelines are active and maintained",
+            "Document deployment procedures",
+        ]),
+        ('FORKED PROJECTS', [
+            forks,
+            "Clarify purpose and maintenance status of forks",
+            "Consider contributing changes upstream",
+        ]),
+    ]
+
+
+def build_report(org, summary, sections=SECTIONS):
+    """
+    Build the analysis report as plain data.
+
+    Args:
+        org: Organization fields (repository nodes are not needed)
+        summary: Aggregated statistics from summarize_repositories
+        sections: Section names to include
+
+    Returns:
+        Dictionary keyed by section name
+    """
+    report = {}
+    total = summary['total']
+
+    if 'overview' in sections:
+        try:
+            report['overview'] = {
+                'name': org.get('name', 'N/A'),
+                'login': org.get('login', 'N/A'),
+                'url': org.get('url', 'N/A'),
+                'created_at': org.get('createdAt', 'N/A'),
+                'total_repositories': org['repositories'].get('totalCount', 0),
+                'total_members': org['membersWithRole'].get('totalCount', 0),
+            }
+        except KeyError as e:
+            print(f"Error: Missing expected key in data structure: {e}")
+            sys.exit(1)
+
+    if 'languages' in sections:
+        report['languages'] = dict(sorted(summary['language_counts'].items(), key=lambda x: x[1], reverse=True))
+
+    if 'categories' in sections:
+        report['categories'] = {
+            display: sorted(summary['categories'][key])
+            for key, display, _, _ in CATEGORIES if summary['categories'].get(key)
+        }
+
+    if 'health' in sections:
+        repos_with_desc = summary['with_description']
+        report['health'] = {
+            'total_repositories': total,
+            'repositories_with_description': repos_with_desc,
+            'repositories_without_description': total - repos_with_desc,
+            'description_coverage_percentage': round(repos_with_desc / total * 100, 1) if total else 0,
+            'original_repositories': total - summary['forked'],
+            'forked_repositories': summary['forked'],
+            'archived_repositories': summary['archived'],
+            'private_repositories': summary['private'],
+        }
+
+    if 'activity' in sections:
+        report['activity'] = [{'name': name, 'days_ago': days} for name, days in summary['recent']]
+
+    if 'recommendations' in sections:
+        login = org.get('login')
+        report['recommendations'] = [
+            {'title': title, 'items': items}
+            for title, items in build_recommendations(summary, login, load_profile(login))
+        ]
+
+    return report
+
+
+def print_report(report, login=None):
+    """
+    Print an analysis report built by build_report as text.
+
+    Args:
+        report: Report dictionary from build_report
+        login: Organization login shown in the header
+    """
+    print("=" * 80)
+    print(f"{login.upper()} ORGANIZATION ANALYSIS" if login else "ORGANIZATION ANALYSIS")
     print("=" * 80)
 
-    print("\n1. DOCUMENTATION GAPS:")
-    print(f"   - {repos_without_desc} repositories lack descriptions")
-    print("   - Add clear, concise descriptions to all repositories")
-    print("   - Ensure README files exist in all active repositories")
+    if 'overview' in report:
+        overview = report['overview']
+        print(f"\nOrganization: {overview['name']}")
+        print(f"Login: {overview['login']}")
+        print(f"URL: {overview['url']}")
+        print(f"Created: {overview['created_at']}")
+        print(f"Total Repositories: {overview['total_repositories']}")
+        print(f"Total Members: {overview['total_members']}")
 
-    print("\n2. REPOSITORY ORGANIZATION:")
-    print("   - Consider archiving unused experimental repositories")
-    print("   - Add topics/tags to repositories for better discoverability")
-    print("   - Create a comprehensive organization README (org-o9nn)")
+    if 'languages' in report:
+        print("\n" + "=" * 80)
+        print("LANGUAGE DISTRIBUTION")
+        print("=" * 80)
+        for lang, count in report['languages'].items():
+            print(f"{lang}: {count} repositories")
 
-    print("\n3. NAMING CONVENTIONS:")
-    print("   - All repositories follow 'cog*' naming pattern (good consistency)")
-    print("   - Consider adding prefixes for different categories (e.g., 'cog-core-*', 'cog-tools-*')")
+    if 'categories' in report:
+        print("\n" + "=" * 80)
+        print("REPOSITORY CATEGORIES")
+        print("=" * 80)
+        for category, repos_list in report['categories'].items():
+            print(f"\n{category} ({len(repos_list)}):")
+            for repo in repos_list:
+                print(f"  - {repo}")
 
-    print("\n4. LANGUAGE ECOSYSTEM:")
-    print("   - Strong Python presence (good for ML/AI)")
-    print("   - Multiple low-level implementations (C, C++, Rust, Zig, Go)")
-    print("   - Consider consolidating similar implementations")
+    if 'health' in report:
+        health = report['health']
+        total = health['total_repositories']
+        repos_with_desc = health['repositories_with_description']
+        repos_without_desc = health['repositories_without_description']
+        print("\n" + "=" * 80)
+        print("REPOSITORY HEALTH METRICS")
+        print("=" * 80)
+        print(f"\nRepositories with descriptions: {repos_with_desc}/{total} ({repos_with_desc/total*100:.1f}%)")
+        print(f"Repositories without descriptions: {repos_without_desc}/{total} ({repos_without_desc/total*100:.1f}%)")
+        print(f"Original repositories: {health['original_repositories']}")
+        print(f"Forked repositories: {health['forked_repositories']}")
+        print(f"Archived repositories: {health['archived_repositories']}")
+        print(f"Private repositories: {health['private_repositories']}")
 
-    print("\n5. INTEGRATION & DEPLOYMENT:")
-    print("   - Good separation of concerns (infra, CI, deploy)")
-    print("   - Ensure CI/CD pipelines are active and maintained")
-    print("   - Document deployment procedures")
+    if 'activity' in report:
+        print("\n" + "=" * 80)
+        print("RECENT ACTIVITY (Last 30 days)")
+        print("=" * 80)
+        if report['activity']:
+            for entry in report['activity']:
+                print(f"  - {entry['name']} (updated {entry['days_ago']} days ago)")
+        else:
+            print("  No repositories updated in the last 30 days")
 
-    print("\n6. FORKED PROJECTS:")
-    print(f"   - {forked_repos} forked repositories (Pygmalion AI related)")
-    print("   - Clarify purpose and maintenance status of forks")
-    print("   - Consider contributing changes upstream")
+    if 'recommendations' in report:
+        print("\n" + "=" * 80)
+        print("RECOMMENDATIONS FOR IMPROVEMENT")
+        print("=" * 80)
+        for number, recommendation in enumerate(report['recommendations'], start=1):
+            print(f"\n{number}. {recommendation['title']}:")
+            for item in recommendation['items']:
+                print(f"   - {item}")
 
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
     print("=" * 80)
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Analyze the organization snapshot.")
+    parser.add_argument('--sections', default='all',
+                        help=f"Comma-separated sections to compute ({', '.join(SECTIONS)}) or 'all'")
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format (default: text)")
+    parser.add_argument('--input', type=Path, default=RAW_DATA_FILE, help="Snapshot to analyze")
+    args = parser.parse_args(argv)
+    try:
+        args.sections = parse_sections(args.sections)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
     """Main execution function."""
-    print(f"Loading organization data from: {RAW_DATA_FILE}")
-    data = load_organization_data(RAW_DATA_FILE)
-    analyze_organization(data)
+    args = parse_args(argv)
+    metrics = MetricsRecorder('analyze_org')
+    if args.format == 'text':
+        print(f"Loading organization data from: {args.input}")
+    with metrics.stage('load_and_aggregate'):
+        org, summary = load_organization_summary(args.input, aggregates=required_aggregates(args.sections))
+    with metrics.stage('analyze'):
+        report = build_report(org, summary, args.sections)
+        if args.format == 'json':
+            org_json.write_stdout(report)
+        else:
+            print_report(report, org.get('login'))
+    metrics.write()
 
 
 if __name__ == "__main__":
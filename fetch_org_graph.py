@@ -4,25 +4,52 @@ O9NN Organization Graph Fetcher
 Fetches organization data from GitHub GraphQL API and saves to JSON files.
 """
 
+import argparse
+import hashlib
 import json
 import os
+import subprocess
 import sys
+import time
+import traceback
 from datetime import datetime
 from pathlib import Path
 
 import requests
 
+from org_enrich import DEFAULT_COST_BUDGET, build_relation_edges, enrich_repositories
+import org_json
+from org_index import update_index
+from org_graph import build_graph, graph_summary, repository_scores, strategic_importance
+from org_metrics import MetricsRecorder
+from org_profiles import CATEGORIES, RepositoryCategorizer, category_description
+
 # Get script directory for relative paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
 RAW_OUTPUT_FILE = SCRIPT_DIR / 'org-graph-raw.json'
 PROCESSED_OUTPUT_FILE = SCRIPT_DIR / 'org-graph.json'
+WATCH_STATE_FILE = SCRIPT_DIR / '.org-graph-watch.json'
+ENRICH_CACHE_FILE = SCRIPT_DIR / '.org-graph-enrich-cache.json'
+
+# GitHub GraphQL API endpoint (override to point at a local stand-in server)
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', "https://api.github.com/graphql")
 
-# GitHub GraphQL API endpoint
-GITHUB_API_URL = "https://api.github.com/graphql"
+# Watch mode defaults (seconds)
+DEFAULT_WATCH_INTERVAL = 300
+DEFAULT_WATCH_MAX_INTERVAL = 3600
+WATCH_BACKOFF_FACTOR = 2
+# Pause polling until reset when fewer rate-limit points than this remain
+WATCH_MIN_RATE_LIMIT = 50
 
 # GraphQL query to fetch organization data
 GRAPHQL_QUERY = """
 query($orgLogin: String!, $cursor: String) {
+  rateLimit {
+    cost
+    remaining
+    limit
+    resetAt
+  }
   organization(login: $orgLogin) {
     name
     login
@@ -52,6 +79,9 @@ query($orgLogin: String!, $cursor: String) {
         isFork
         isArchived
         isTemplate
+        parent {
+          nameWithOwner
+        }
         primaryLanguage {
           name
           color
@@ -93,16 +123,53 @@ query($orgLogin: String!, $cursor: String) {
 """
 
 
-def fetch_organization_data(org_login, github_token):
+# Minimal query used by watch mode to detect organization changes (cost: 1 point)
+PROBE_QUERY = """
+query($orgLogin: String!) {
+  rateLimit {
+    cost
+    remaining
+    limit
+    resetAt
+  }
+  organization(login: $orgLogin) {
+    updatedAt
+    repositories(first: 1, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      totalCount
+      nodes {
+        name
+        pushedAt
+      }
+    }
+    recentlyUpdated: repositories(first: 1, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes {
+        name
+        updatedAt
+      }
+    }
+  }
+}
+"""
+
+
+class FetchError(Exception):
+    """Raised when the organization data cannot be fetched from the API."""
+
+
+def fetch_organization_data(org_login, github_token, metrics=None):
     """
     Fetch organization data from GitHub GraphQL API.
     
     Args:
         org_login: GitHub organization login name
         github_token: GitHub personal access token
+        metrics: Optional MetricsRecorder for request latency and rate-limit data
         
     Returns:
         Complete organization data dictionary
+        
+    Raises:
+        FetchError: On network, HTTP or GraphQL errors, or a malformed response
     """
     headers = {
         "Authorization": f"Bearer {github_token}",
@@ -121,6 +188,7 @@ def fetch_organization_data(org_login, github_token):
             "cursor": cursor
         }
         
+        request_start = time.perf_counter()
         try:
             response = requests.post(
                 GITHUB_API_URL,
@@ -128,13 +196,19 @@ def fetch_organization_data(org_login, github_token):
                 json={"query": GRAPHQL_QUERY, "variables": variables},
                 timeout=30
             )
+            if metrics:
+                metrics.observe_request(time.perf_counter() - request_start,
+                                        response_bytes=len(response.content),
+                                        error=not response.ok)
             response.raise_for_status()
             
-            data = response.json()
+            data = org_json.loads(response.content)
             
             if "errors" in data:
-                print(f"GraphQL errors: {data['errors']}")
-                sys.exit(1)
+                raise FetchError(f"GraphQL errors: {data['errors']}")
+            
+            if metrics:
+                metrics.observe_rate_limit(data['data'].get('rateLimit'))
             
             org_data = data['data']['organization']
             repos = org_data['repositories']
@@ -148,11 +222,13 @@ def fetch_organization_data(org_login, github_token):
             print(f"  Fetched {len(all_repos)} repositories so far...")
             
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching data from GitHub API: {e}")
-            sys.exit(1)
-        except KeyError as e:
-            print(f"Error parsing response data: {e}")
-            sys.exit(1)
+            if metrics and getattr(e, 'response', None) is None:
+                metrics.observe_request(time.perf_counter() - request_start, error=True)
+            raise FetchError(f"Error fetching data from GitHub API: {e}") from e
+        except org_json.JSONDecodeError as e:
+            raise FetchError(f"Invalid JSON in API response: {e}") from e
+        except (KeyError, TypeError) as e:
+            raise FetchError(f"Error parsing response data: {e!r}") from e
     
     # Combine all repositories into final structure
     org_data['repositories']['nodes'] = all_repos
@@ -160,12 +236,13 @@ def fetch_organization_data(org_login, github_token):
     return {"data": {"organization": org_data}}
 
 
-def process_organization_data(raw_data):
+def process_organization_data(raw_data, relations=None):
     """
     Process raw organization data into structured format.
     
     Args:
         raw_data: Raw data from GitHub API
+        relations: Optional relation edges from org_enrich.build_relation_edges
         
     Returns:
         Processed organization data dictionary
@@ -173,102 +250,19 @@ def process_organization_data(raw_data):
     org = raw_data['data']['organization']
     repos = org['repositories']['nodes']
     
+    login = org.get('login', '')
+    categorize = RepositoryCategorizer(login)
+    profile = categorize.profile
+    
     # Categorize repositories
     categories = {
-        'core_libraries': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'critical',
-            'description': 'High-performance implementations of neural network primitives and cognitive computing foundations'
-        },
-        'infrastructure': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'critical',
-            'description': 'DevOps, monitoring, and configuration management'
-        },
-        'tools_cli': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'medium',
-            'description': 'Command-line interfaces and developer tools'
-        },
-        'web_api': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'high',
-            'description': 'Web interfaces and API services'
-        },
-        'data_models': {
+        key: {
             'count': 0,
             'repositories': [],
-            'strategic_importance': 'high',
-            'description': 'Data processing, model training, and evaluation'
-        },
-        'documentation': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'high',
-            'description': 'Documentation, research papers, and assets'
-        },
-        'testing_benchmarking': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'critical',
-            'description': 'Quality assurance and performance testing'
-        },
-        'deployment_cloud': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'high',
-            'description': 'Cloud deployment and orchestration'
-        },
-        'experimental': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'low',
-            'description': 'Prototypes and experimental features'
-        },
-        'integrations': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'high',
-            'description': 'Third-party integrations and connectors'
-        },
-        'mobile_desktop': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'medium',
-            'description': 'Native applications'
-        },
-        'forked_projects': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'medium',
-            'description': 'PygmalionAI ecosystem integrations'
-        },
-        'organization': {
-            'count': 0,
-            'repositories': [],
-            'strategic_importance': 'medium',
-            'description': 'Organization meta-repository'
+            'strategic_importance': importance,
+            'description': category_description(key, profile)
         }
-    }
-    
-    # Category mapping
-    category_map = {
-        'core_libraries': ['cogpy', 'cogplan9', 'cogpilot.jl', 'cognu-mach', 'coglux', 'coglow', 'coggml', 'cogmetal', 'cogwhisper', 'cogllama', 'cogtorch', 'cogllm', 'nnpu'],
-        'infrastructure': ['coginfra', 'cogci', 'cogmonitor', 'cogconfig', 'cogdeploy'],
-        'tools_cli': ['cogcli', 'cogtools', 'cogscripts'],
-        'web_api': ['cogweb', 'cogapi', 'cogserve'],
-        'data_models': ['cogdata', 'cogmodels', 'coglearn', 'cogtrain', 'cogeval'],
-        'documentation': ['cogdocs', 'cogpapers', 'cogresearch', 'cognotebooks', 'cogexamples', 'cogassets', 'cogmedia', 'cogbrand', 'cogarchive', 'coglegacy', 'cogviz'],
-        'testing_benchmarking': ['cogbench', 'cogtests'],
-        'deployment_cloud': ['cogcloud'],
-        'experimental': ['cogexp', 'cogproto', 'cogsandbox', 'cogplayground'],
-        'integrations': ['cogintegrations', 'cogconnectors', 'cogadapters', 'cogbridge', 'cogsdk', 'cogclient', 'cogplugins', 'cogextensions'],
-        'mobile_desktop': ['cogmobile', 'cogdesktop'],
-        'organization': ['org-o9nn']
+        for key, _, importance, _ in CATEGORIES
     }
     
     # Language distribution
@@ -277,7 +271,6 @@ def process_organization_data(raw_data):
     # Categorize and count
     for repo in repos:
         name = repo.get('name', '')
-        is_fork = repo.get('isFork', False)
         
         # Count languages
         if repo.get('primaryLanguage'):
@@ -285,17 +278,19 @@ def process_organization_data(raw_data):
             language_counts[lang] = language_counts.get(lang, 0) + 1
         
         # Categorize
-        if is_fork:
-            categories['forked_projects']['repositories'].append(name)
-            categories['forked_projects']['count'] += 1
-        else:
-            categorized = False
-            for cat_key, repo_list in category_map.items():
-                if name in repo_list:
-                    categories[cat_key]['repositories'].append(name)
-                    categories[cat_key]['count'] += 1
-                    categorized = True
-                    break
+        cat_key = categorize(name, repo.get('isFork', False))
+        if cat_key:
+            categories[cat_key]['repositories'].append(name)
+            categories[cat_key]['count'] += 1
+    
+    # Derive strategic importance from graph centrality; categories without
+    # repositories keep their default level
+    graph = build_graph(repos, login, relations)
+    scores = graph.pagerank()
+    category_repos = {cat_key: cat['repositories'] for cat_key, cat in categories.items()}
+    for cat_key, (level, centrality) in strategic_importance(category_repos, repository_scores(graph, scores)).items():
+        categories[cat_key]['strategic_importance'] = level
+        categories[cat_key]['centrality'] = round(centrality, 6)
     
     # Calculate health metrics
     repos_with_desc = sum(1 for r in repos if r.get('description'))
@@ -306,10 +301,14 @@ def process_organization_data(raw_data):
     public_repos = len(repos) - private_repos
     archived_repos = sum(1 for r in repos if r.get('isArchived', False))
     
+    # Most central core libraries are the first candidates for consolidation
+    core_libraries = sorted(categories['core_libraries']['repositories'],
+                            key=lambda name: -scores[graph.node_id('repository', name)])[:4]
+    
     # Build processed data structure
     processed_data = {
         'metadata': {
-            'organization': org.get('login', ''),
+            'organization': login,
             'analysis_date': datetime.now().strftime('%Y-%m-%d'),
             'total_repositories': len(repos),
             'total_members': org['membersWithRole'].get('totalCount', 0),
@@ -317,6 +316,7 @@ def process_organization_data(raw_data):
         },
         'categories': categories,
         'languages': language_counts,
+        'graph': graph_summary(graph, scores),
         'health_metrics': {
             'repositories_with_description': repos_with_desc,
             'repositories_without_description': repos_without_desc,
@@ -341,7 +341,8 @@ def process_organization_data(raw_data):
                 "Define versioning strategy and release cadence"
             ],
             'medium_term': [
-                "Evaluate overlap between cogpy, coggml, cogtorch, cogllm",
+                f"Evaluate overlap between {', '.join(core_libraries)}" if len(core_libraries) > 1
+                else "Evaluate overlap between similar core libraries",
                 "Conduct comprehensive benchmarking",
                 "Build community engagement programs",
                 "Develop plugin marketplace"
@@ -355,42 +356,332 @@ def process_organization_data(raw_data):
         }
     }
     
+    if relations is not None:
+        processed_data['relations'] = relations
+    
     return processed_data
 
 
-def main():
-    """Main execution function."""
-    # Get GitHub token from environment
-    github_token = os.environ.get('GITHUB_TOKEN') or os.environ.get('magoo')
-    
-    if not github_token:
-        print("Error: GitHub token not found in environment variables")
-        print("Please set GITHUB_TOKEN or magoo environment variable")
-        sys.exit(1)
+def run_refresh(org_login, github_token, enrich=False, enrich_cost_budget=DEFAULT_COST_BUDGET, pretty=False):
+    """
+    Fetch, process and save the organization graph.
     
-    org_login = os.environ.get('ORG_LOGIN', 'o9nn')
+    Args:
+        org_login: GitHub organization login name
+        github_token: GitHub personal access token
+        enrich: Also fetch contributors, releases and dependencies as relation edges
+        enrich_cost_budget: Rate-limit points a single enrichment request may cost
+        pretty: Indent the saved JSON files instead of writing them compactly
+        
+    Returns:
+        Processed organization data dictionary
+        
+    Raises:
+        FetchError: If the organization data cannot be fetched
+    """
+    metrics = MetricsRecorder('fetch_org_graph')
     
     # Fetch organization data
-    raw_data = fetch_organization_data(org_login, github_token)
+    with metrics.stage('fetch'):
+        raw_data = fetch_organization_data(org_login, github_token, metrics=metrics)
     
     # Save raw data
     print(f"\nSaving raw data to: {RAW_OUTPUT_FILE}")
-    with open(RAW_OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(raw_data, f, indent=2)
+    with metrics.stage('save_raw'):
+        org_json.dump(raw_data, RAW_OUTPUT_FILE, pretty=pretty)
+    
+    # Optionally enrich repositories with relation data
+    relations = None
+    if enrich:
+        with metrics.stage('enrich'):
+            enrichment = enrich_repositories(
+                org_login,
+                raw_data['data']['organization']['repositories']['nodes'],
+                github_token,
+                GITHUB_API_URL,
+                ENRICH_CACHE_FILE,
+                cost_budget=enrich_cost_budget,
+                metrics=metrics
+            )
+            relations = build_relation_edges(org_login, enrichment)
     
     # Process data
     print("Processing organization data...")
-    processed_data = process_organization_data(raw_data)
+    with metrics.stage('process'):
+        processed_data = process_organization_data(raw_data, relations=relations)
     
     # Save processed data
     print(f"Saving processed data to: {PROCESSED_OUTPUT_FILE}")
-    with open(PROCESSED_OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(processed_data, f, indent=2)
+    with metrics.stage('save_processed'):
+        org_json.dump(processed_data, PROCESSED_OUTPUT_FILE, pretty=pretty)
+    
+    # Update the search index, re-tokenizing only changed repositories
+    with metrics.stage('index'):
+        index_stats = update_index(raw_data['data']['organization']['repositories']['nodes'], org_login)
+    print(f"Search index updated: {index_stats['reindexed']} repositories tokenized, "
+          f"{index_stats['reused']} unchanged")
+    
+    written = metrics.write()
+    if written:
+        print(f"Metrics written to: {written[0].parent}")
     
     print("\n✅ Organization graph updated successfully!")
     print(f"   Total repositories: {processed_data['metadata']['total_repositories']}")
     print(f"   Total members: {processed_data['metadata']['total_members']}")
     print(f"   Description coverage: {processed_data['health_metrics']['description_coverage_percentage']}%")
+    
+    return processed_data
+
+
+def fetch_probe(org_login, github_token, metrics=None):
+    """
+    Run the cheap change-detection probe query.
+    
+    Args:
+        org_login: GitHub organization login name
+        github_token: GitHub personal access token
+        metrics: Optional MetricsRecorder for request latency and rate-limit data
+        
+    Returns:
+        Tuple of (organization probe data, rateLimit data or None)
+        
+    Raises:
+        requests.exceptions.RequestException: On network or HTTP errors
+        ValueError: On GraphQL errors or a malformed response
+    """
+    headers = {
+        "Authorization": f"Bearer {github_token}",
+        "Content-Type": "application/json"
+    }
+    request_start = time.perf_counter()
+    try:
+        response = requests.post(
+            GITHUB_API_URL,
+            headers=headers,
+            json={"query": PROBE_QUERY, "variables": {"orgLogin": org_login}},
+            timeout=30
+        )
+    except requests.exceptions.RequestException:
+        if metrics:
+            metrics.observe_request(time.perf_counter() - request_start, error=True)
+        raise
+    if metrics:
+        metrics.observe_request(time.perf_counter() - request_start,
+                                response_bytes=len(response.content),
+                                error=not response.ok)
+    response.raise_for_status()
+    
+    data = org_json.loads(response.content)
+    if "errors" in data:
+        raise ValueError(f"GraphQL errors: {data['errors']}")
+    
+    rate_limit = data['data'].get('rateLimit')
+    if metrics:
+        metrics.observe_rate_limit(rate_limit)
+    
+    org = data['data']['organization']
+    if org is None:
+        raise ValueError(f"Organization not found: {org_login}")
+    return org, rate_limit
+
+
+def probe_fingerprint(probe):
+    """
+    Compute a stable fingerprint of a probe result.
+    
+    Args:
+        probe: Organization data returned by fetch_probe
+        
+    Returns:
+        Hex SHA-256 digest of the fields that change when the organization does
+    """
+    pushed = probe['repositories']['nodes']
+    updated = probe['recentlyUpdated']['nodes']
+    fields = {
+        'updatedAt': probe.get('updatedAt'),
+        'totalCount': probe['repositories'].get('totalCount'),
+        'lastPushed': [pushed[0].get('name'), pushed[0].get('pushedAt')] if pushed else None,
+        'lastUpdated': [updated[0].get('name'), updated[0].get('updatedAt')] if updated else None,
+    }
+    encoded = json.dumps(fields, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_watch_state(filepath):
+    """Load the last seen fingerprint from the watch state file."""
+    try:
+        return org_json.load(filepath)
+    except (FileNotFoundError, org_json.JSONDecodeError):
+        return {}
+
+
+def save_watch_state(filepath, state):
+    """Persist the watch state so restarts do not trigger a redundant refresh."""
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    org_json.dump(state, tmp_path, pretty=True)
+    os.replace(tmp_path, filepath)
+
+
+def next_watch_interval(current, changed, base_interval, max_interval):
+    """
+    Compute the delay before the next probe.
+    
+    The interval resets to the base after a change and grows geometrically
+    while the organization stays unchanged, capped at max_interval.
+    """
+    if changed:
+        return base_interval
+    return min(current * WATCH_BACKOFF_FACTOR, max_interval)
+
+
+def rate_limit_delay(rate_limit):
+    """Return seconds to wait for a rate-limit reset, or 0 if enough points remain."""
+    if not rate_limit or rate_limit.get('remaining') is None:
+        return 0
+    if rate_limit['remaining'] >= WATCH_MIN_RATE_LIMIT or not rate_limit.get('resetAt'):
+        return 0
+    reset_at = datetime.fromisoformat(rate_limit['resetAt'].replace('Z', '+00:00'))
+    return max(0, (reset_at - datetime.now(reset_at.tzinfo)).total_seconds())
+
+
+def watch_organization(org_login, github_token, interval=DEFAULT_WATCH_INTERVAL,
+                       max_interval=DEFAULT_WATCH_MAX_INTERVAL, on_change=None,
+                       max_polls=None, state_file=WATCH_STATE_FILE, enrich=False,
+                       enrich_cost_budget=DEFAULT_COST_BUDGET, pretty=False):
+    """
+    Poll the probe query and refresh the graph only when the organization changes.
+    
+    A failed probe or refresh is reported and retried on a later poll: the
+    previous fingerprint is kept and the polling interval backs off as if
+    nothing had changed. Unexpected errors are logged with their traceback
+    instead of stopping the watcher.
+    
+    Args:
+        org_login: GitHub organization login name
+        github_token: GitHub personal access token
+        interval: Base polling interval in seconds
+        max_interval: Upper bound for the adaptive backoff in seconds
+        on_change: Optional shell command run after each successful refresh
+        max_polls: Stop after this many probes (None polls forever)
+        state_file: Path used to persist the last seen fingerprint
+        enrich: Run the enrichment stage on each refresh
+        enrich_cost_budget: Rate-limit points a single enrichment request may cost
+        pretty: Indent the saved JSON files instead of writing them compactly
+    """
+    state = load_watch_state(state_file)
+    delay = interval
+    polls = 0
+    
+    print(f"Watching organization: {org_login} (interval {interval}s, max {max_interval}s)")
+    
+    while max_polls is None or polls < max_polls:
+        polls += 1
+        metrics = MetricsRecorder('fetch_org_graph_watch')
+        changed = False
+        rate_limit = None
+        try:
+            with metrics.stage('probe'):
+                probe, rate_limit = fetch_probe(org_login, github_token, metrics=metrics)
+            fingerprint = probe_fingerprint(probe)
+            changed = fingerprint != state.get('fingerprint')
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            print(f"Probe failed: {e}")
+            fingerprint = None
+        except Exception:
+            print("Probe failed unexpectedly:")
+            traceback.print_exc()
+            fingerprint = None
+        metrics.write()
+        
+        if changed:
+            print(f"Change detected (fingerprint {fingerprint[:12]}), refreshing...")
+            try:
+                run_refresh(org_login, github_token, enrich=enrich, enrich_cost_budget=enrich_cost_budget,
+                            pretty=pretty)
+            except FetchError as e:
+                # Keep the previous fingerprint so the next poll retries
+                print(f"Refresh failed, will retry: {e}")
+                changed = False
+            except Exception:
+                print("Refresh failed unexpectedly, will retry:")
+                traceback.print_exc()
+                changed = False
+            else:
+                if on_change:
+                    result = subprocess.run(on_change, shell=True, cwd=SCRIPT_DIR)
+                    if result.returncode != 0:
+                        print(f"Warning: on-change command exited with status {result.returncode}")
+                state = {
+                    'fingerprint': fingerprint,
+                    'refreshed_at': datetime.now().isoformat(timespec='seconds'),
+                }
+                save_watch_state(state_file, state)
+        elif fingerprint:
+            print(f"No change (fingerprint {fingerprint[:12]})")
+        
+        delay = next_watch_interval(delay, changed, interval, max_interval)
+        wait = max(delay, rate_limit_delay(rate_limit))
+        if max_polls is not None and polls >= max_polls:
+            break
+        print(f"Next probe in {wait:.0f}s")
+        time.sleep(wait)
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Fetch the organization graph from the GitHub GraphQL API.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Poll a cheap probe query and refresh only when the organization changes")
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL,
+                        help=f"Base polling interval in seconds (default: {DEFAULT_WATCH_INTERVAL})")
+    parser.add_argument('--max-interval', type=float, default=DEFAULT_WATCH_MAX_INTERVAL,
+                        help=f"Maximum backoff interval in seconds (default: {DEFAULT_WATCH_MAX_INTERVAL})")
+    parser.add_argument('--on-change', metavar='CMD',
+                        help="Shell command to run after each refresh (e.g. 'make analyze visualize')")
+    parser.add_argument('--max-polls', type=int,
+                        help="Exit after this many probes (default: poll forever)")
+    parser.add_argument('--enrich', action='store_true',
+                        help="Fetch contributors, releases and dependency manifests as relation edges")
+    parser.add_argument('--enrich-cost-budget', type=float, default=DEFAULT_COST_BUDGET,
+                        help=f"Rate-limit points per enrichment request (default: {DEFAULT_COST_BUDGET})")
+    parser.add_argument('--pretty', action='store_true',
+                        help="Indent the saved JSON files (default: compact)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    
+    # Get GitHub token from environment
+    github_token = os.environ.get('GITHUB_TOKEN') or os.environ.get('magoo')
+    
+    if not github_token:
+        print("Error: GitHub token not found in environment variables")
+        print("Please set GITHUB_TOKEN or magoo environment variable")
+        sys.exit(1)
+    
+    org_login = os.environ.get('ORG_LOGIN', 'o9nn')
+    
+    if args.watch:
+        watch_organization(org_login, github_token,
+                           interval=args.interval,
+                           max_interval=args.max_interval,
+                           on_change=args.on_change,
+                           max_polls=args.max_polls,
+                           enrich=args.enrich,
+                           enrich_cost_budget=args.enrich_cost_budget,
+                           pretty=args.pretty)
+    else:
+        try:
+            run_refresh(org_login, github_token, enrich=args.enrich, enrich_cost_budget=args.enrich_cost_budget,
+                        pretty=args.pretty)
+        except FetchError as e:
+            print(e)
+            sys.exit(1)
+        except OSError as e:
+            print(f"Error saving organization graph: {e}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
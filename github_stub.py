@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+O9NN GitHub API Stand-in
+Local GraphQL server that answers fetch_org_graph.py queries from a saved
+snapshot, so fetch and watch mode can be exercised without GitHub.
+
+The probe query sees a change every `--change-every` probes (the most
+recently pushed repository gets a new pushedAt), and every `--fail-every`-th
+request fails, either with HTTP 502 (`--fail-with status`) or with a
+response whose repository nodes are null (`--fail-with data`), which makes
+processing fail with an unexpected error.
+
+Refreshes still write the usual output files, so serve a copy of the
+snapshot rather than org-graph-raw.json itself when injecting failures.
+
+Usage:
+    cp org-graph-raw.json /tmp/stub-snapshot.json
+    python github_stub.py --snapshot /tmp/stub-snapshot.json --change-every 2 --fail-every 10
+    GITHUB_API_URL=http://127.0.0.1:8765/graphql GITHUB_TOKEN=stub \\
+        python fetch_org_graph.py --watch --interval 1 --max-polls 6
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import org_json
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEFAULT_SNAPSHOT = SCRIPT_DIR / 'org-graph-raw.json'
+
+DEFAULT_PORT = 8765
+# Repositories per page, matching `repositories(first: 100)` in the fetch query
+PAGE_SIZE = 100
+
+RATE_LIMIT = {'cost': 1, 'remaining': 5000, 'limit': 5000, 'resetAt': '2099-01-01T00:00:00Z'}
+
+
+class StubState:
+    """Snapshot data and request counters shared across requests."""
+
+    def __init__(self, organization, change_every=0, fail_every=0, fail_with='status'):
+        self.organization = organization
+        self.change_every = change_every
+        self.fail_every = fail_every
+        self.fail_with = fail_with
+        self.requests = 0
+        self.probes = 0
+
+    def should_fail(self):
+        """Count a request and report whether it is one of the injected failures."""
+        self.requests += 1
+        return bool(self.fail_every) and self.requests % self.fail_every == 0
+
+    def probe(self):
+        """Answer the watch-mode probe, bumping pushedAt every `change_every` probes."""
+        self.probes += 1
+        repos = self.organization['repositories']['nodes']
+        if self.change_every and self.probes % self.change_every == 0 and repos:
+            latest = max(repos, key=lambda repo: repo.get('pushedAt') or '')
+            # Offset by the probe count so consecutive changes differ within a second
+            pushed_at = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=self.probes)
+            latest['pushedAt'] = pushed_at.isoformat().replace('+00:00', 'Z')
+        pushed = max(repos, key=lambda repo: repo.get('pushedAt') or '', default=None)
+        updated = max(repos, key=lambda repo: repo.get('updatedAt') or '', default=None)
+        return {
+            'updatedAt': self.organization.get('updatedAt'),
+            'repositories': {
+                'totalCount': len(repos),
+                'nodes': [{'name': pushed['name'], 'pushedAt': pushed.get('pushedAt')}] if pushed else [],
+            },
+            'recentlyUpdated': {
+                'nodes': [{'name': updated['name'], 'updatedAt': updated.get('updatedAt')}] if updated else [],
+            },
+        }
+
+    def page(self, cursor, broken=False):
+        """Answer one page of the full organization query."""
+        repos = self.organization['repositories']['nodes']
+        start = int(cursor or 0)
+        end = start + PAGE_SIZE
+        nodes = [None] * len(repos[start:end]) if broken else repos[start:end]
+        organization = {key: value for key, value in self.organization.items() if key != 'repositories'}
+        organization['repositories'] = {
+            'totalCount': len(repos),
+            'pageInfo': {'hasNextPage': end < len(repos), 'endCursor': str(end)},
+            'nodes': nodes,
+        }
+        return organization
+
+
+def make_handler(state):
+    """Create a request handler class bound to the stub state."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = org_json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            query = body.get('query', '')
+            variables = body.get('variables') or {}
+            fail = state.should_fail()
+            if fail and state.fail_with == 'status':
+                self._reply(502, {'message': 'Injected failure'})
+                return
+
+            data = {'rateLimit': RATE_LIMIT}
+            if 'recentlyUpdated' in query:
+                data['organization'] = state.probe()
+            elif 'organization(' in query:
+                data['organization'] = state.page(variables.get('cursor'), broken=fail)
+            # Enrichment queries get no repository results, so nothing is cached
+            self._reply(200, {'data': data})
+
+        def _reply(self, status, payload):
+            content = org_json.dumps(payload)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            print(f"stub: {self.command} {self.path} -> {format % args}", file=sys.stderr)
+
+    return StubHandler
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the GitHub GraphQL API.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default: {DEFAULT_PORT}, 0 picks a free port)")
+    parser.add_argument('--snapshot', type=Path, default=DEFAULT_SNAPSHOT,
+                        help="Raw snapshot to serve (default: org-graph-raw.json)")
+    parser.add_argument('--change-every', type=int, default=0,
+                        help="Report an organization change every N probes (default: never)")
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help="Fail every N-th request (default: never)")
+    parser.add_argument('--fail-with', choices=('status', 'data'), default='status',
+                        help="Fail with HTTP 502 or with null repository nodes (default: status)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    try:
+        organization = org_json.load(args.snapshot)['data']['organization']
+        if not all(isinstance(repo, dict) for repo in organization['repositories']['nodes']):
+            raise TypeError("repository nodes must be objects")
+    except FileNotFoundError:
+        print(f"Error: {args.snapshot} not found")
+        sys.exit(1)
+    except (org_json.JSONDecodeError, KeyError, TypeError) as e:
+        print(f"Error: {args.snapshot} is not a raw organization snapshot: {e!r}")
+        sys.exit(1)
+
+    state = StubState(organization, change_every=args.change_every,
+                      fail_every=args.fail_every, fail_with=args.fail_with)
+    server = HTTPServer(('127.0.0.1', args.port), make_handler(state))
+    print(f"Serving {args.snapshot.name} at http://127.0.0.1:{server.server_port}/graphql", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
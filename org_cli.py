@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Graph CLI
+Single entry point for fetching, analyzing, visualizing and diffing the
+organization graph.
+
+Subcommand modules are imported only when their subcommand runs, so heavy
+dependencies (requests for fetch, matplotlib for visualize) never load for
+analysis-only runs.
+
+Usage:
+    python org_cli.py analyze --sections languages,health --format json
+    python org_cli.py fetch [--watch ...]
+    python org_cli.py visualize
+    python org_cli.py diff OLD.json NEW.json -o DELTA.json
+    python org_cli.py apply BASE.json DELTA.json -o OUT.json
+    python org_cli.py graph [--neighbors REPO --hops 2]
+    python org_cli.py compare A.json B.json [--format json]
+    python org_cli.py search 'lang:python llm*'
+    python org_cli.py startup-check
+"""
+
+import argparse
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+
+# Subcommand -> (module, argv prefix passed to the module's main, help text)
+COMMANDS = {
+    'fetch': ('fetch_org_graph', [], "Fetch organization data from GitHub (supports --watch)"),
+    'analyze': ('analyze_org', [], "Analyze the snapshot (supports --sections and --format)"),
+    'visualize': ('visualize_graph', [], "Render the dashboard and network PNGs"),
+    'diff': ('org_diff', ['diff'], "Compute the delta between two snapshots"),
+    'apply': ('org_diff', ['apply'], "Rebuild a snapshot from a base and deltas"),
+    'graph': ('org_graph', [], "Graph centrality, components and neighbourhoods"),
+    'compare': ('org_compare', [], "Compare several organization snapshots side by side"),
+    'index': ('org_index', ['build'], "Build or update the repository search index"),
+    'search': ('org_index', ['search'], "Search repositories by name, description, topic or language"),
+}
+
+# Median wall time allowed for `analyze --sections overview --format json`,
+# including interpreter start-up (milliseconds)
+STARTUP_BUDGET_MS = 150
+
+# Modules that must not be imported by analysis-only runs
+HEAVY_MODULES = ('matplotlib', 'pandas', 'numpy', 'requests')
+
+
+def run_command(command, argv):
+    """Import the module for a subcommand and run its main()."""
+    module_name, prefix, _ = COMMANDS[command]
+    module = importlib.import_module(module_name)
+    module.main(prefix + argv)
+
+
+def startup_check(runs=7, budget_ms=STARTUP_BUDGET_MS):
+    """
+    Measure CLI start-up time and verify heavy modules load lazily.
+
+    Runs `analyze --sections overview --format json` in fresh interpreters
+    with metrics output disabled and compares the median wall time against
+    the budget.
+
+    Returns:
+        True if the run is within budget and no heavy module was imported
+    """
+    cmd = [sys.executable, str(SCRIPT_DIR / 'org_cli.py'), 'analyze', '--sections', 'overview', '--format', 'json']
+    env = dict(os.environ, ORG_METRICS='0')
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    median_ms = statistics.median(timings)
+
+    baseline = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        baseline.append((time.perf_counter() - start) * 1000)
+    baseline_ms = statistics.median(baseline)
+
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + cmd[1:], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            imported.add(line.rsplit('|', 1)[1].strip().split('.')[0])
+    heavy = sorted(imported.intersection(HEAVY_MODULES))
+
+    within_budget = median_ms <= budget_ms
+    print(f"Start-up time (median of {runs}): {median_ms:.1f} ms "
+          f"(interpreter alone: {baseline_ms:.1f} ms, budget: {budget_ms} ms)")
+    print(f"Heavy modules imported: {', '.join(heavy) or 'none'}")
+    if within_budget and not heavy:
+        print("✅ Start-up within budget")
+    else:
+        print("❌ Start-up check failed")
+    return within_budget and not heavy
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="O9NN organization graph tools.",
+        epilog="Run '%(prog)s <command> --help' for command options.")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='<command>')
+    for name, (_, _, help_text) in COMMANDS.items():
+        # Options are forwarded to the subcommand module, which handles --help itself
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    check = subparsers.add_parser('startup-check', help="Measure start-up time against the documented budget")
+    check.add_argument('--runs', type=int, default=7, help="Number of timed runs (default: 7)")
+    check.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                       help=f"Start-up budget in milliseconds (default: {STARTUP_BUDGET_MS})")
+    args, forwarded = parser.parse_known_args(argv)
+    if args.command == 'startup-check' and forwarded:
+        parser.error(f"unrecognized arguments: {' '.join(forwarded)}")
+    args.args = forwarded
+    return args
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    if args.command == 'startup-check':
+        if not startup_check(runs=args.runs, budget_ms=args.budget_ms):
+            sys.exit(1)
+    else:
+        run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
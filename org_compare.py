@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Comparison
+Side-by-side analytics for several organization snapshots.
+
+All snapshots are streamed into one columnar table: one row per repository,
+tagged with its organization index. Languages, licenses and topics are
+interned once across every organization, so each repository stores small
+integer ids instead of strings. Language shares, health metrics and activity
+distributions for all organizations are then computed together with grouped
+numpy reductions over the shared columns, so comparing 50 organizations costs
+little more than analysing one.
+
+Usage:
+    python org_compare.py snapshots/o9nn.json snapshots/other.json [--format json]
+"""
+
+import argparse
+import sys
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import org_json
+from org_stream import SnapshotFormatError, SnapshotStream
+
+# Upper bounds (days since last update) of the activity buckets; repositories
+# updated longer ago fall in a final open-ended bucket
+ACTIVITY_BUCKETS = (7, 30, 90, 365)
+ACTIVITY_LABELS = ('<=7d', '8-30d', '31-90d', '91-365d', '>365d')
+
+# Health metrics reported as percentages of each organization's repositories
+HEALTH_METRICS = ('description', 'fork', 'archived', 'private', 'topics', 'license')
+
+
+class Interner:
+    """Assigns dense integer ids to strings."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """Return the id of value, assigning the next id if it is new."""
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class OrgTable:
+    """
+    Repositories of several organizations in shared columnar form.
+
+    Attributes:
+        labels: Organization labels, indexed by organization id
+        organizations: Organization fields (without repository nodes) per organization
+        languages, licenses, topics: Interner instances shared by all organizations
+        columns: Dictionary of numpy arrays with one entry per repository
+            (`org`, `language`, `license`, flag columns, `updated` and
+            `pushed` as datetime64) after finalize(); `topic_indptr` and
+            `topic_ids` hold each repository's topics in CSR form
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.organizations = []
+        self.languages = Interner()
+        self.licenses = Interner()
+        self.topics = Interner()
+        self._org = array('i')
+        self._language = array('i')
+        self._license = array('i')
+        self._flags = {name: array('b') for name in ('description', 'fork', 'archived', 'private')}
+        self._updated = []
+        self._pushed = []
+        self._topic_indptr = array('q', [0])
+        self._topic_ids = array('i')
+        self.columns = None
+
+    @property
+    def num_repositories(self):
+        return len(self._org)
+
+    def add_organization(self, label, repos):
+        """
+        Append the repositories of one organization.
+
+        Args:
+            label: Display label of the organization (may be assigned after
+                streaming, via labels[org_id])
+            repos: Iterable of repository node dictionaries (may be a stream)
+
+        Returns:
+            Organization id
+        """
+        org_id = len(self.labels)
+        self.labels.append(label)
+        for repo in repos:
+            self._org.append(org_id)
+            language = repo.get('primaryLanguage')
+            self._language.append(self.languages.intern(language['name']) if language else -1)
+            license_info = repo.get('licenseInfo')
+            spdx = license_info.get('spdxId') if license_info else None
+            self._license.append(self.licenses.intern(spdx) if spdx else -1)
+            self._flags['description'].append(bool(repo.get('description')))
+            self._flags['fork'].append(bool(repo.get('isFork')))
+            self._flags['archived'].append(bool(repo.get('isArchived')))
+            self._flags['private'].append(bool(repo.get('isPrivate')))
+            # numpy parses naive ISO timestamps; GitHub's are all UTC
+            self._updated.append((repo.get('updatedAt') or 'NaT').rstrip('Z'))
+            self._pushed.append((repo.get('pushedAt') or 'NaT').rstrip('Z'))
+            for topic in (repo.get('repositoryTopics') or {}).get('nodes') or []:
+                if topic.get('topic'):
+                    self._topic_ids.append(self.topics.intern(topic['topic']['name']))
+            self._topic_indptr.append(len(self._topic_ids))
+        return org_id
+
+    def finalize(self):
+        """Convert the appended rows to numpy columns."""
+        columns = {
+            'org': np.frombuffer(self._org, dtype=np.int32),
+            'language': np.frombuffer(self._language, dtype=np.int32),
+            'license': np.frombuffer(self._license, dtype=np.int32),
+            'updated': np.array(self._updated, dtype='datetime64[s]'),
+            'pushed': np.array(self._pushed, dtype='datetime64[s]'),
+            'topic_indptr': np.frombuffer(self._topic_indptr, dtype=np.int64),
+            'topic_ids': np.frombuffer(self._topic_ids, dtype=np.int32),
+        }
+        for name, values in self._flags.items():
+            columns[name] = np.frombuffer(values, dtype=np.int8).astype(bool)
+        self.columns = columns
+        self._updated = self._pushed = None
+        return self
+
+
+def load_snapshots(filepaths):
+    """
+    Stream several snapshot files into one OrgTable.
+
+    Organizations are labelled by login (falling back to the file name);
+    repeated labels get the file name appended.
+
+    Raises:
+        FileNotFoundError: If a snapshot does not exist
+        SnapshotFormatError: If a snapshot is malformed
+    """
+    table = OrgTable()
+    for filepath in filepaths:
+        stream = SnapshotStream(filepath)
+        try:
+            org_id = table.add_organization(None, stream)
+        except org_json.JSONDecodeError as e:
+            raise SnapshotFormatError(f"Invalid repository node in {filepath}: {e}") from e
+        label = stream.organization.get('login') or Path(filepath).stem
+        if label in table.labels:
+            label = f"{label} ({Path(filepath).name})"
+        table.labels[org_id] = label
+        table.organizations.append(stream.organization)
+    return table.finalize()
+
+
+def _grouped_counts(org, values, num_orgs, num_values):
+    """Return a (num_orgs, num_values) matrix counting values per organization."""
+    mask = values >= 0
+    flat = org[mask].astype(np.int64) * num_values + values[mask]
+    return np.bincount(flat, minlength=num_orgs * num_values).reshape(num_orgs, num_values)
+
+
+def _percent(counts, totals):
+    """Return counts as percentages of per-organization totals (0 where empty)."""
+    totals = totals.reshape((-1,) + (1,) * (counts.ndim - 1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(totals > 0, np.round(counts / np.maximum(totals, 1) * 100, 1), 0.0)
+
+
+def _grouped_median(org, values, num_orgs):
+    """Return the median of values per organization, ignoring NaN (NaN if none)."""
+    valid = ~np.isnan(values)
+    org, values = org[valid], values[valid]
+    order = np.lexsort((values, org))
+    org, values = org[order], values[order]
+    counts = np.bincount(org, minlength=num_orgs)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    medians = np.full(num_orgs, np.nan)
+    has = counts > 0
+    lower = starts[has] + (counts[has] - 1) // 2
+    upper = starts[has] + counts[has] // 2
+    medians[has] = (values[lower] + values[upper]) / 2
+    return medians
+
+
+def compare_organizations(table, now=None, top_languages=8):
+    """
+    Compute side-by-side statistics for every organization in a table.
+
+    Args:
+        table: Finalized OrgTable
+        now: Reference time for activity (defaults to datetime.now())
+        top_languages: Number of most common languages (across all
+            organizations) reported individually; the rest are summed as "Other"
+
+    Returns:
+        JSON-serializable dictionary keyed by section, each mapping a metric
+        to {organization label: value}
+    """
+    cols = table.columns
+    org = cols['org']
+    num_orgs = len(table.labels)
+    totals = np.bincount(org, minlength=num_orgs)
+    now = np.datetime64((now or datetime.now()).replace(microsecond=0, tzinfo=None), 's')
+
+    def by_org(values):
+        return {label: value for label, value in zip(table.labels, values)}
+
+    # Language shares
+    language_counts = _grouped_counts(org, cols['language'], num_orgs, len(table.languages))
+    order = np.argsort(-language_counts.sum(axis=0), kind='stable')
+    top = order[:top_languages]
+    language_shares = _percent(language_counts, totals)
+    languages = {table.languages.values[i]: by_org(language_shares[:, i].tolist()) for i in top}
+    other = language_counts[:, order[top_languages:]].sum(axis=1)
+    none = totals - language_counts.sum(axis=1)
+    languages['Other'] = by_org(_percent(other, totals).tolist())
+    languages['None'] = by_org(_percent(none, totals).tolist())
+
+    # Health metrics
+    has_topics = np.diff(cols['topic_indptr']) > 0
+    flags = {
+        'description': cols['description'],
+        'fork': cols['fork'],
+        'archived': cols['archived'],
+        'private': cols['private'],
+        'topics': has_topics,
+        'license': cols['license'] >= 0,
+    }
+    health = {'repositories': by_org(totals.tolist())}
+    for name in HEALTH_METRICS:
+        counts = np.bincount(org, weights=flags[name], minlength=num_orgs)
+        health[f'{name}_percentage'] = by_org(_percent(counts, totals).tolist())
+    license_counts = _grouped_counts(org, cols['license'], num_orgs, len(table.licenses))
+    if len(table.licenses):
+        common = license_counts.argmax(axis=1)
+        health['most_common_license'] = by_org([
+            table.licenses.values[i] if license_counts[o, i] else None for o, i in enumerate(common)
+        ])
+
+    # Activity distribution (days since last update / push)
+    updated_days = (now - cols['updated']) / np.timedelta64(1, 'D')
+    pushed_days = (now - cols['pushed']) / np.timedelta64(1, 'D')
+    known = ~np.isnan(updated_days)
+    buckets = np.searchsorted(ACTIVITY_BUCKETS, updated_days[known], side='left')
+    bucket_counts = _grouped_counts(org[known], buckets, num_orgs, len(ACTIVITY_LABELS))
+    bucket_shares = _percent(bucket_counts, totals)
+    activity = {label: by_org(bucket_shares[:, i].tolist()) for i, label in enumerate(ACTIVITY_LABELS)}
+    medians = _grouped_median(org, pushed_days, num_orgs)
+    activity['median_days_since_push'] = by_org([None if np.isnan(m) else round(float(m), 1) for m in medians])
+
+    return {
+        'organizations': list(table.labels),
+        'dictionaries': {
+            'languages': len(table.languages),
+            'licenses': len(table.licenses),
+            'topics': len(table.topics),
+        },
+        'languages': languages,
+        'health': health,
+        'activity': activity,
+    }
+
+
+def _print_table(title, report_section, labels, value_format):
+    """Print one section with organizations as rows and metrics as columns."""
+    metrics = list(report_section)
+    rows = [[value_format(report_section[metric][label]) if report_section[metric][label] is not None else '-'
+             for metric in metrics] for label in labels]
+    label_width = max([len('Organization')] + [len(label) for label in labels])
+    widths = [max([len(metric)] + [len(row[i]) for row in rows]) for i, metric in enumerate(metrics)]
+    print("\n" + "=" * 80)
+    print(title)
+    print("=" * 80)
+    print(f"{'Organization':<{label_width}}  " + "  ".join(f"{m:>{w}}" for m, w in zip(metrics, widths)))
+    for label, row in zip(labels, rows):
+        print(f"{label:<{label_width}}  " + "  ".join(f"{cell:>{w}}" for cell, w in zip(row, widths)))
+
+
+def print_comparison(report):
+    """Print a comparison report built by compare_organizations as text."""
+    labels = report['organizations']
+    dictionaries = report['dictionaries']
+    print("=" * 80)
+    print("ORGANIZATION COMPARISON")
+    print("=" * 80)
+    print(f"\nOrganizations: {len(labels)}")
+    print(f"Distinct languages: {dictionaries['languages']}, licenses: {dictionaries['licenses']}, "
+          f"topics: {dictionaries['topics']}")
+
+    _print_table("LANGUAGE SHARE (% of repositories)", report['languages'], labels, lambda v: f"{v:.1f}")
+    health = {key.replace('_percentage', ' %'): value for key, value in report['health'].items()}
+    _print_table("REPOSITORY HEALTH", health, labels, str)
+    activity = {key.replace('median_days_since_push', 'median push age (d)'): value
+                for key, value in report['activity'].items()}
+    _print_table("ACTIVITY (% of repositories by days since update)", activity, labels, str)
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Compare several organization snapshots side by side.")
+    parser.add_argument('snapshots', type=Path, nargs='+', help="org-graph-raw.json snapshots to compare")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="Output format (default: text)")
+    parser.add_argument('--top-languages', type=int, default=8,
+                        help="Languages reported individually (default: 8)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    try:
+        table = load_snapshots(args.snapshots)
+    except FileNotFoundError as e:
+        print(f"Error: File not found: {e.filename}")
+        sys.exit(1)
+    except SnapshotFormatError as e:
+        print(f"Error: Invalid snapshot: {e}")
+        sys.exit(1)
+
+    report = compare_organizations(table, top_languages=args.top_languages)
+    if args.format == 'json':
+        org_json.write_stdout(report)
+    else:
+        print_comparison(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Snapshot Diff
+Computes the change set between two org-graph-raw.json snapshots and
+applies deltas to reconstruct newer snapshots.
+
+Both snapshots are indexed by repository name (the fetch query does not
+request node ids) and each node is fingerprinted, so a diff is O(n). Renames
+are detected by pairing removed and added repositories that share a creation
+timestamp. When the repository order changes, only the repositories that
+moved are recorded with their new positions, or an integer permutation when
+most of them moved.
+
+Usage:
+    python org_diff.py diff OLD.json NEW.json [-o DELTA.json]
+    python org_diff.py apply BASE.json DELTA.json [DELTA.json ...] -o OUT.json
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import org_json
+
+DELTA_FORMAT = 'org-graph-delta/1'
+
+# Node field that stays the same when a repository is renamed
+RENAME_KEY_FIELD = 'createdAt'
+
+
+class DeltaError(ValueError):
+    """Raised when a delta cannot be applied to a snapshot."""
+
+
+def _canonical(value):
+    """Return the canonical JSON encoding used for fingerprints."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def node_fingerprint(node):
+    """Return a short digest identifying the content of a repository node."""
+    return hashlib.blake2b(_canonical(node), digest_size=16).hexdigest()
+
+
+def snapshot_digest(snapshot):
+    """Return a digest of a whole snapshot, used to validate delta chains."""
+    return hashlib.sha256(_canonical(snapshot)).hexdigest()
+
+
+def node_key(node):
+    """Return the identity key of a repository node (its name)."""
+    return node.get('name', '')
+
+
+def _increasing_run(values):
+    """
+    Return the indices of a longest strictly increasing subsequence.
+
+    Patience sorting: tails[i] is the index of the smallest value ending an
+    increasing subsequence of length i + 1.
+    """
+    tails = []
+    tail_values = []
+    previous = [None] * len(values)
+    for i, value in enumerate(values):
+        length = bisect.bisect_left(tail_values, value)
+        previous[i] = tails[length - 1] if length else None
+        if length == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[length] = i
+            tail_values[length] = value
+    run = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.add(i)
+        i = previous[i]
+    return run
+
+
+def _split_snapshot(snapshot):
+    """Return (organization fields without nodes, repository nodes)."""
+    try:
+        org = snapshot['data']['organization']
+        nodes = org['repositories']['nodes']
+    except (KeyError, TypeError) as e:
+        raise DeltaError(f"Missing expected key in snapshot: {e}") from e
+    header = {key: value for key, value in org.items() if key != 'repositories'}
+    header['repositories'] = {key: value for key, value in org['repositories'].items() if key != 'nodes'}
+    return header, nodes
+
+
+def _topic_names(node):
+    """Return the set of topic names of a repository node."""
+    topics = (node.get('repositoryTopics') or {}).get('nodes') or []
+    return {t['topic']['name'] for t in topics if t.get('topic')}
+
+
+def _field_changes(old, new):
+    """Return ({field: new_value} for changed/added fields, [removed fields])."""
+    changed = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def diff_snapshots(old, new):
+    """
+    Compute the delta between two snapshots.
+
+    Args:
+        old: Older snapshot dictionary (org-graph-raw.json format)
+        new: Newer snapshot dictionary
+
+    Returns:
+        Delta dictionary containing everything needed to rebuild `new` from
+        `old`, plus a `changes` section classifying notable changes
+    """
+    old_header, old_nodes = _split_snapshot(old)
+    new_header, new_nodes = _split_snapshot(new)
+
+    old_index = {node_key(node): node for node in old_nodes}
+    new_index = {node_key(node): node for node in new_nodes}
+
+    removed_keys = [key for key in old_index if key not in new_index]
+    added_keys = [key for key in new_index if key not in old_index]
+
+    # Pair removed and added repositories created at the same instant as renames
+    removed_by_created = {}
+    for key in removed_keys:
+        created = old_index[key].get(RENAME_KEY_FIELD)
+        if created:
+            removed_by_created.setdefault(created, []).append(key)
+    renamed = {}
+    for key in added_keys:
+        candidates = removed_by_created.get(new_index[key].get(RENAME_KEY_FIELD))
+        if candidates:
+            renamed[candidates.pop(0)] = key
+    renamed_new = set(renamed.values())
+    removed_keys = [key for key in removed_keys if key not in renamed]
+    added_keys = [key for key in added_keys if key not in renamed_new]
+
+    modified = {}
+    changes = {
+        'archived': [],
+        'unarchived': [],
+        'description_added': [],
+        'description_removed': [],
+        'topics_added': {},
+        'topics_removed': {},
+    }
+    old_key_for = {new_key: old_key for old_key, new_key in renamed.items()}
+    for key, new_node in new_index.items():
+        if key in old_index:
+            old_node = old_index[key]
+        elif key in old_key_for:
+            old_node = old_index[old_key_for[key]]
+        else:
+            continue
+        if node_fingerprint(old_node) == node_fingerprint(new_node):
+            continue
+
+        changed, unset = _field_changes(old_node, new_node)
+        entry = {'set': changed}
+        if unset:
+            entry['unset'] = unset
+        modified[key] = entry
+
+        name = new_node.get('name', key)
+        if new_node.get('isArchived') and not old_node.get('isArchived'):
+            changes['archived'].append(name)
+        elif old_node.get('isArchived') and not new_node.get('isArchived'):
+            changes['unarchived'].append(name)
+        if new_node.get('description') and not old_node.get('description'):
+            changes['description_added'].append(name)
+        elif old_node.get('description') and not new_node.get('description'):
+            changes['description_removed'].append(name)
+        old_topics = _topic_names(old_node)
+        new_topics = _topic_names(new_node)
+        if new_topics - old_topics:
+            changes['topics_added'][name] = sorted(new_topics - old_topics)
+        if old_topics - new_topics:
+            changes['topics_removed'][name] = sorted(old_topics - new_topics)
+
+    header_set, header_unset = _field_changes(old_header, new_header)
+
+    delta = {
+        'format': DELTA_FORMAT,
+        'base_digest': snapshot_digest(old),
+        'result_digest': snapshot_digest(new),
+        'organization': {'set': header_set, 'unset': header_unset},
+        'removed': removed_keys,
+        'renamed': renamed,
+        'added': [new_index[key] for key in added_keys],
+        'modified': modified,
+        'changes': changes,
+    }
+
+    # Record the repositories whose position differs from the order apply_delta
+    # produces. Repositories on a longest run already in the new relative order
+    # stay put, so a single move costs one entry instead of the whole order
+    removed_set = set(removed_keys)
+    natural_order = [renamed.get(key, key) for key in old_index if key not in removed_set]
+    natural_order.extend(added_keys)
+    new_position = {key: i for i, key in enumerate(new_index)}
+    positions = [new_position[key] for key in natural_order]
+    if positions != sorted(positions):
+        staying = _increasing_run(positions)
+        if len(staying) * 2 >= len(positions):
+            delta['moved'] = sorted(
+                ([key, positions[i]] for i, key in enumerate(natural_order) if i not in staying),
+                key=lambda entry: entry[1],
+            )
+        else:
+            # Mostly reshuffled: natural-order index of each repository in the new order
+            permutation = [0] * len(positions)
+            for i, position in enumerate(positions):
+                permutation[position] = i
+            delta['permutation'] = permutation
+
+    return delta
+
+
+def apply_delta(base, delta, verify=True):
+    """
+    Reconstruct a newer snapshot from a base snapshot and a delta.
+
+    Args:
+        base: Snapshot the delta was computed against
+        delta: Delta dictionary from diff_snapshots
+        verify: Check the base and result digests recorded in the delta
+
+    Returns:
+        The reconstructed snapshot dictionary
+
+    Raises:
+        DeltaError: If the delta does not match the base snapshot
+    """
+    if delta.get('format') != DELTA_FORMAT:
+        raise DeltaError(f"Unsupported delta format: {delta.get('format')}")
+    if verify and snapshot_digest(base) != delta['base_digest']:
+        raise DeltaError("Delta was not computed against this base snapshot")
+
+    header, nodes = _split_snapshot(base)
+    index = {node_key(node): node for node in nodes}
+
+    for key in delta['removed']:
+        if index.pop(key, None) is None:
+            raise DeltaError(f"Removed repository not in base: {key}")
+
+    renamed = delta['renamed']
+    if renamed:
+        index = {renamed.get(key, key): node for key, node in index.items()}
+
+    for key, entry in delta['modified'].items():
+        if key not in index:
+            raise DeltaError(f"Modified repository not in base: {key}")
+        node = dict(index[key])
+        node.update(entry['set'])
+        for field in entry.get('unset', []):
+            node.pop(field, None)
+        index[key] = node
+
+    for node in delta['added']:
+        index[node_key(node)] = node
+
+    new_nodes = list(index.values())
+    moved = delta.get('moved')
+    permutation = delta.get('permutation')
+    if permutation:
+        if sorted(permutation) != list(range(len(new_nodes))):
+            raise DeltaError("Repository permutation does not match the result")
+        new_nodes = [new_nodes[i] for i in permutation]
+    elif moved:
+        moved_keys = {key for key, _ in moved}
+        order = [key for key in index if key not in moved_keys]
+        # Ascending positions: everything before each position is already placed
+        for key, position in moved:
+            order.insert(position, key)
+        try:
+            new_nodes = [index[key] for key in order]
+        except KeyError as e:
+            raise DeltaError(f"Moved repository not in result: {e.args[0]}") from e
+
+    org_delta = delta['organization']
+    header.update(org_delta['set'])
+    for field in org_delta['unset']:
+        header.pop(field, None)
+    org = {key: value for key, value in header.items() if key != 'repositories'}
+    org['repositories'] = dict(header.get('repositories', {}), nodes=new_nodes)
+    result = {'data': {'organization': org}}
+
+    if verify and snapshot_digest(result) != delta['result_digest']:
+        raise DeltaError("Reconstructed snapshot does not match the delta result digest")
+    return result
+
+
+def print_changes(delta):
+    """Print a human-readable summary of a delta."""
+    changes = delta['changes']
+    print("=" * 80)
+    print("SNAPSHOT CHANGES")
+    print("=" * 80)
+    print(f"Added: {len(delta['added'])}")
+    for node in delta['added']:
+        print(f"  + {node.get('name', node_key(node))}")
+    print(f"Removed: {len(delta['removed'])}")
+    for key in delta['removed']:
+        print(f"  - {key}")
+    print(f"Renamed: {len(delta['renamed'])}")
+    for old_key, new_key in delta['renamed'].items():
+        print(f"  ~ {old_key} -> {new_key}")
+    print(f"Modified: {len(delta['modified'])}")
+    print(f"Became archived: {', '.join(changes['archived']) or 'none'}")
+    print(f"Unarchived: {', '.join(changes['unarchived']) or 'none'}")
+    print(f"Gained descriptions: {', '.join(changes['description_added']) or 'none'}")
+    print(f"Lost descriptions: {', '.join(changes['description_removed']) or 'none'}")
+    print(f"Gained topics: {len(changes['topics_added'])}")
+    for name, topics in changes['topics_added'].items():
+        print(f"  {name}: {', '.join(topics)}")
+    if delta['organization']['set'] or delta['organization']['unset']:
+        fields = list(delta['organization']['set']) + delta['organization']['unset']
+        print(f"Organization fields changed: {', '.join(fields)}")
+
+
+def load_json(filepath):
+    """Load a JSON file, exiting with an error message on failure."""
+    try:
+        return org_json.load(filepath)
+    except FileNotFoundError:
+        print(f"Error: File not found: {filepath}")
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in {filepath}: {e}")
+        sys.exit(1)
+
+
+def save_json(filepath, data, pretty=False):
+    """Write JSON compactly (or indented) to a file."""
+    org_json.dump(data, filepath, pretty=pretty)
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Diff org-graph snapshots and apply deltas.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = subparsers.add_parser('diff', help="Compute the delta between two snapshots")
+    diff_parser.add_argument('old', type=Path, help="Older snapshot")
+    diff_parser.add_argument('new', type=Path, help="Newer snapshot")
+    diff_parser.add_argument('-o', '--output', type=Path, help="Write the delta to this file")
+    diff_parser.add_argument('-q', '--quiet', action='store_true', help="Do not print the change summary")
+
+    apply_parser = subparsers.add_parser('apply', help="Rebuild a snapshot from a base and deltas")
+    apply_parser.add_argument('base', type=Path, help="Base snapshot")
+    apply_parser.add_argument('deltas', type=Path, nargs='+', help="Deltas to apply in order")
+    apply_parser.add_argument('-o', '--output', type=Path, required=True, help="Output snapshot")
+    apply_parser.add_argument('--pretty', action='store_true', help="Indent the output snapshot")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    try:
+        if args.command == 'diff':
+            delta = diff_snapshots(load_json(args.old), load_json(args.new))
+            if not args.quiet:
+                print_changes(delta)
+            if args.output:
+                save_json(args.output, delta)
+                print(f"\nDelta saved to: {args.output}")
+        else:
+            snapshot = load_json(args.base)
+            for delta_path in args.deltas:
+                snapshot = apply_delta(snapshot, load_json(delta_path))
+            save_json(args.output, snapshot, pretty=args.pretty)
+            print(f"Snapshot reconstructed to: {args.output}")
+    except DeltaError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
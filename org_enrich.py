@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Graph Enrichment
+Fetches per-repository contributors, releases and dependency manifests in
+batched GraphQL requests and turns them into relation edges.
+
+Many repositories are packed into one aliased GraphQL document, sized so a
+request stays within a rate-limit cost budget. Nested connections are only
+paginated where GitHub reports more pages (manifest and dependency lists),
+and results are cached per repository and `pushedAt`, so unchanged
+repositories are never queried again. Contributors are taken from a sample
+of the latest default-branch commits; records note when the sample does not
+cover the whole history.
+"""
+
+import json
+import os
+import time
+
+import requests
+
+import org_json
+
+# Connection page sizes used by the enrichment query
+COMMIT_SAMPLE_SIZE = 100
+RELEASES_PAGE_SIZE = 5
+MANIFESTS_PAGE_SIZE = 25
+DEPENDENCIES_PAGE_SIZE = 100
+
+# Default rate-limit points a single enrichment request may cost
+DEFAULT_COST_BUDGET = 10
+
+# GitHub rejects queries that could return more than this many nodes
+MAX_QUERY_NODES = 500000
+
+# Dependency graph fields are still behind a preview media type
+PREVIEW_ACCEPT = "application/vnd.github.hawkgirl-preview+json"
+
+ENRICH_FRAGMENT = f"""
+fragment EnrichFields on Repository {{
+  name
+  pushedAt
+  defaultBranchRef {{
+    target {{
+      ... on Commit {{
+        history(first: {COMMIT_SAMPLE_SIZE}) {{
+          totalCount
+          nodes {{
+            author {{
+              user {{
+                login
+              }}
+            }}
+          }}
+        }}
+      }}
+    }}
+  }}
+  releases(first: {RELEASES_PAGE_SIZE}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+    totalCount
+    nodes {{
+      tagName
+      publishedAt
+    }}
+  }}
+  dependencyGraphManifests(first: {MANIFESTS_PAGE_SIZE}) {{
+    ...ManifestPage
+  }}
+}}
+"""
+
+MANIFEST_FRAGMENT = f"""
+fragment ManifestPage on DependencyGraphManifestConnection {{
+  totalCount
+  pageInfo {{
+    hasNextPage
+    endCursor
+  }}
+  nodes {{
+    id
+    filename
+    dependencies(first: {DEPENDENCIES_PAGE_SIZE}) {{
+      ...DependencyPage
+    }}
+  }}
+}}
+"""
+
+DEPENDENCY_FRAGMENT = """
+fragment DependencyPage on DependencyGraphDependencyConnection {
+  pageInfo {
+    hasNextPage
+    endCursor
+  }
+  nodes {
+    packageName
+    packageManager
+    requirements
+    repository {
+      nameWithOwner
+    }
+  }
+}
+"""
+
+RATE_LIMIT_FIELDS = """
+  rateLimit {
+    cost
+    remaining
+    limit
+    resetAt
+  }
+"""
+
+
+class EnrichmentError(Exception):
+    """Raised when an enrichment request fails."""
+
+
+def estimate_repo_cost():
+    """
+    Estimate the query cost of enriching one repository.
+
+    GitHub charges one request per connection fetched (100 requests cost one
+    point) and limits the total number of nodes a query may return.
+
+    Returns:
+        Tuple of (connection requests, maximum nodes)
+    """
+    connections = 3 + MANIFESTS_PAGE_SIZE  # history, releases, manifests, dependencies per manifest
+    nodes = (COMMIT_SAMPLE_SIZE + RELEASES_PAGE_SIZE + MANIFESTS_PAGE_SIZE
+             + MANIFESTS_PAGE_SIZE * DEPENDENCIES_PAGE_SIZE)
+    return connections, nodes
+
+
+def repos_per_request(cost_budget=DEFAULT_COST_BUDGET):
+    """Return how many repositories fit into one request under the cost budget."""
+    connections, nodes = estimate_repo_cost()
+    by_cost = int(cost_budget * 100) // connections
+    by_nodes = MAX_QUERY_NODES // nodes
+    return max(1, min(by_cost, by_nodes))
+
+
+def manifest_pages_per_request(cost_budget=DEFAULT_COST_BUDGET):
+    """Return how many follow-up dependency pages fit into one request under the cost budget."""
+    return max(1, min(int(cost_budget * 100), MAX_QUERY_NODES // DEPENDENCIES_PAGE_SIZE))
+
+
+def build_batch_query(repo_names):
+    """
+    Build one aliased GraphQL document enriching several repositories.
+
+    Args:
+        repo_names: Repository names; alias rN corresponds to repo_names[N]
+
+    Returns:
+        GraphQL query string taking an `$owner` variable
+    """
+    fields = [
+        f"  r{i}: repository(owner: $owner, name: {json.dumps(name)}) {{\n    ...EnrichFields\n  }}"
+        for i, name in enumerate(repo_names)
+    ]
+    return ("query($owner: String!) {\n" + RATE_LIMIT_FIELDS + "\n".join(fields) + "\n}\n"
+            + ENRICH_FRAGMENT + MANIFEST_FRAGMENT + DEPENDENCY_FRAGMENT)
+
+
+def build_manifest_page_query(pages):
+    """
+    Build one aliased GraphQL document fetching the next manifest pages.
+
+    Args:
+        pages: List of (repository name, cursor); alias rN corresponds to pages[N]
+
+    Returns:
+        GraphQL query string taking an `$owner` variable
+    """
+    fields = [
+        f"  r{i}: repository(owner: $owner, name: {json.dumps(name)}) {{\n"
+        f"    dependencyGraphManifests(first: {MANIFESTS_PAGE_SIZE}, after: {json.dumps(cursor)}) {{\n"
+        f"      ...ManifestPage\n    }}\n  }}"
+        for i, (name, cursor) in enumerate(pages)
+    ]
+    return ("query($owner: String!) {\n" + RATE_LIMIT_FIELDS + "\n".join(fields) + "\n}\n"
+            + MANIFEST_FRAGMENT + DEPENDENCY_FRAGMENT)
+
+
+def build_dependency_page_query(pages):
+    """
+    Build one aliased GraphQL document fetching the next dependency pages.
+
+    Args:
+        pages: List of (manifest_id, cursor); alias mN corresponds to pages[N]
+
+    Returns:
+        GraphQL query string
+    """
+    fields = [
+        f"  m{i}: node(id: {json.dumps(manifest_id)}) {{\n"
+        f"    ... on DependencyGraphManifest {{\n"
+        f"      dependencies(first: {DEPENDENCIES_PAGE_SIZE}, after: {json.dumps(cursor)}) {{\n"
+        f"        ...DependencyPage\n      }}\n    }}\n  }}"
+        for i, (manifest_id, cursor) in enumerate(pages)
+    ]
+    return "query {\n" + RATE_LIMIT_FIELDS + "\n".join(fields) + "\n}\n" + DEPENDENCY_FRAGMENT
+
+
+def _post_query(api_url, github_token, query, variables=None, metrics=None):
+    """
+    Send a GraphQL request and return its data.
+
+    Partial results are returned when only some aliases failed (for example
+    repositories with the dependency graph disabled).
+
+    Raises:
+        EnrichmentError: On network errors, a response that is not a JSON
+            object, or when no data was returned
+    """
+    headers = {
+        "Authorization": f"Bearer {github_token}",
+        "Content-Type": "application/json",
+        "Accept": PREVIEW_ACCEPT,
+    }
+    request_start = time.perf_counter()
+    try:
+        response = requests.post(
+            api_url,
+            headers=headers,
+            json={"query": query, "variables": variables or {}},
+            timeout=60
+        )
+    except requests.exceptions.RequestException as e:
+        if metrics:
+            metrics.observe_request(time.perf_counter() - request_start, error=True)
+        raise EnrichmentError(f"Enrichment request failed: {e}") from e
+    if metrics:
+        metrics.observe_request(time.perf_counter() - request_start,
+                                response_bytes=len(response.content),
+                                error=not response.ok)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise EnrichmentError(f"Enrichment request failed: {e}") from e
+
+    try:
+        data = org_json.loads(response.content)
+    except org_json.JSONDecodeError as e:
+        raise EnrichmentError(f"Invalid JSON in enrichment response: {e}") from e
+    if not isinstance(data, dict):
+        raise EnrichmentError(f"Unexpected enrichment response: {type(data).__name__} instead of an object")
+    if not isinstance(data.get('data'), dict) or not data['data']:
+        raise EnrichmentError(f"GraphQL errors: {data.get('errors')}")
+    if "errors" in data:
+        print(f"  Warning: {len(data['errors'])} partial GraphQL error(s) in enrichment batch")
+    if metrics:
+        metrics.observe_rate_limit(data['data'].get('rateLimit'))
+    return data['data']
+
+
+def _extract_repository(node):
+    """Reduce a raw enrichment result to the cached per-repository record."""
+    history = ((node.get('defaultBranchRef') or {}).get('target') or {}).get('history') or {}
+    history_nodes = history.get('nodes') or []
+    contributors = sorted({
+        entry['author']['user']['login']
+        for entry in history_nodes
+        if entry.get('author') and entry['author'].get('user')
+    })
+
+    releases = node.get('releases') or {}
+    release_nodes = releases.get('nodes') or []
+
+    manifests = node.get('dependencyGraphManifests') or {}
+
+    return {
+        'contributors': contributors,
+        # Contributors come from the latest commits only
+        'commits_sampled': len(history_nodes),
+        'commits_total': history.get('totalCount', len(history_nodes)),
+        'releases': {
+            'count': releases.get('totalCount', 0),
+            'latest': [{'tag': r.get('tagName'), 'published_at': r.get('publishedAt')} for r in release_nodes],
+        },
+        'manifests': [_extract_manifest(manifest) for manifest in manifests.get('nodes') or []],
+        '_manifest_page': manifests.get('pageInfo') or {},
+    }
+
+
+def _extract_manifest(manifest):
+    """Reduce a manifest node, keeping its dependency page info for pagination."""
+    dependencies = manifest.get('dependencies') or {}
+    return {
+        'id': manifest.get('id'),
+        'filename': manifest.get('filename'),
+        'dependencies': [_extract_dependency(dep) for dep in dependencies.get('nodes') or []],
+        '_page': dependencies.get('pageInfo') or {},
+    }
+
+
+def _extract_dependency(dep):
+    """Reduce a dependency node to the fields used for relation edges."""
+    return {
+        'package': dep.get('packageName'),
+        'manager': dep.get('packageManager'),
+        'requirements': dep.get('requirements'),
+        'repository': (dep.get('repository') or {}).get('nameWithOwner'),
+    }
+
+
+def _paginate_manifests(org_login, fetched, api_url, github_token, batch_size, metrics=None):
+    """Fetch remaining manifest pages for repositories with more than one page."""
+    pending = [(name, record) for name, record in fetched if record['_manifest_page'].get('hasNextPage')]
+    while pending:
+        batch, pending = pending[:batch_size], pending[batch_size:]
+        pages = [(name, record['_manifest_page']['endCursor']) for name, record in batch]
+        data = _post_query(api_url, github_token, build_manifest_page_query(pages),
+                           variables={'owner': org_login}, metrics=metrics)
+        for i, (name, record) in enumerate(batch):
+            manifests = (data.get(f'r{i}') or {}).get('dependencyGraphManifests') or {}
+            record['manifests'].extend(_extract_manifest(manifest) for manifest in manifests.get('nodes') or [])
+            record['_manifest_page'] = manifests.get('pageInfo') or {}
+            if record['_manifest_page'].get('hasNextPage'):
+                pending.append((name, record))
+
+
+def _paginate_dependencies(records, api_url, github_token, batch_size, metrics=None):
+    """Fetch remaining dependency pages for manifests that have more than one page."""
+    pending = [
+        manifest
+        for record in records
+        for manifest in record['manifests']
+        if manifest['_page'].get('hasNextPage') and manifest.get('id')
+    ]
+    while pending:
+        batch, pending = pending[:batch_size], pending[batch_size:]
+        pages = [(manifest['id'], manifest['_page']['endCursor']) for manifest in batch]
+        data = _post_query(api_url, github_token, build_dependency_page_query(pages), metrics=metrics)
+        for i, manifest in enumerate(batch):
+            node = data.get(f'm{i}') or {}
+            dependencies = node.get('dependencies') or {}
+            manifest['dependencies'].extend(_extract_dependency(dep) for dep in dependencies.get('nodes') or [])
+            manifest['_page'] = dependencies.get('pageInfo') or {}
+            if manifest['_page'].get('hasNextPage'):
+                pending.append(manifest)
+
+
+def load_cache(filepath):
+    """Load the enrichment cache, returning an empty cache if it is missing or invalid."""
+    try:
+        return org_json.load(filepath)
+    except (FileNotFoundError, org_json.JSONDecodeError):
+        return {}
+
+
+def save_cache(filepath, cache):
+    """Write the enrichment cache atomically."""
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    org_json.dump(cache, tmp_path)
+    os.replace(tmp_path, filepath)
+
+
+def enrich_repositories(org_login, repos, github_token, api_url, cache_file,
+                        cost_budget=DEFAULT_COST_BUDGET, metrics=None):
+    """
+    Enrich repositories with contributors, releases and dependency manifests.
+
+    Args:
+        org_login: GitHub organization login name
+        repos: Repository nodes from fetch_organization_data
+        github_token: GitHub personal access token
+        api_url: GraphQL endpoint
+        cache_file: Path of the per-repository cache
+        cost_budget: Rate-limit points a single request may cost
+        metrics: Optional MetricsRecorder
+
+    Returns:
+        Dictionary mapping repository name to its enrichment record
+    """
+    cache = load_cache(cache_file)
+    stale = [
+        repo for repo in repos
+        if repo['name'] not in cache or cache[repo['name']].get('pushedAt') != repo.get('pushedAt')
+    ]
+    batch_size = repos_per_request(cost_budget)
+    print(f"Enriching {len(stale)} of {len(repos)} repositories "
+          f"({len(repos) - len(stale)} cached, {batch_size} per request)...")
+
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        names = [repo['name'] for repo in batch]
+        try:
+            data = _post_query(api_url, github_token, build_batch_query(names),
+                               variables={'owner': org_login}, metrics=metrics)
+        except EnrichmentError as e:
+            print(f"  Warning: {e}; keeping cached data for {len(batch)} repositories")
+            continue
+
+        fetched = []
+        for i, repo in enumerate(batch):
+            node = data.get(f'r{i}')
+            if node is not None:
+                fetched.append((repo, _extract_repository(node)))
+        records = [record for _, record in fetched]
+
+        try:
+            _paginate_manifests(org_login, [(repo['name'], record) for repo, record in fetched],
+                                api_url, github_token, batch_size, metrics)
+            _paginate_dependencies(records, api_url, github_token, manifest_pages_per_request(cost_budget), metrics)
+        except EnrichmentError as e:
+            print(f"  Warning: {e}; manifest or dependency lists may be incomplete")
+        for repo, record in fetched:
+            complete = not record.pop('_manifest_page').get('hasNextPage') and not any(
+                manifest['_page'].get('hasNextPage') for manifest in record['manifests'])
+            for manifest in record['manifests']:
+                manifest.pop('_page', None)
+            # Incomplete records are used for this run but cached without
+            # pushedAt, so the next run fetches them again
+            cache[repo['name']] = {'pushedAt': repo.get('pushedAt') if complete else None, 'data': record}
+
+        print(f"  Enriched {min(start + batch_size, len(stale))}/{len(stale)} repositories...")
+        save_cache(cache_file, cache)
+
+    names = {repo['name'] for repo in repos}
+    return {name: entry['data'] for name, entry in cache.items() if name in names}
+
+
+def build_relation_edges(org_login, enrichment):
+    """
+    Convert enrichment records into relation edges.
+
+    Edge types:
+        contributes_to - contributor login -> repository
+        depends_on     - repository -> dependency (repository nameWithOwner
+                         when GitHub resolved it, otherwise package name)
+
+    Args:
+        org_login: GitHub organization login name
+        enrichment: Mapping from enrich_repositories
+
+    Returns:
+        Dictionary with `edges`, per-repository `releases` and
+        `contributor_sample` (commits sampled per repository and the
+        repositories whose history is longer than the sample)
+    """
+    edges = []
+    releases = {}
+    partial = []
+    prefix = f"{org_login}/"
+    for name in sorted(enrichment):
+        record = enrichment[name]
+        for login in record['contributors']:
+            edges.append({'source': login, 'target': name, 'type': 'contributes_to'})
+
+        seen = set()
+        for manifest in record['manifests']:
+            for dep in manifest['dependencies']:
+                target = dep['repository'] or dep['package']
+                if not target or target in seen:
+                    continue
+                seen.add(target)
+                edge = {'source': name, 'target': target, 'type': 'depends_on', 'manager': dep['manager']}
+                if dep['repository'] and dep['repository'].startswith(prefix):
+                    edge['internal'] = True
+                edges.append(edge)
+
+        if record['releases']['count']:
+            releases[name] = record['releases']
+        if record.get('commits_total', 0) > record.get('commits_sampled', 0):
+            partial.append(name)
+
+    return {
+        'edges': edges,
+        'releases': releases,
+        'contributor_sample': {'commits': COMMIT_SAMPLE_SIZE, 'partial': partial},
+    }
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Graph Model
+Builds a compact graph of the organization from a snapshot and computes
+degree, PageRank centrality, connected components and k-hop neighbourhoods.
+
+Nodes are repositories, fork parents, languages, topics and licenses (plus
+contributors and packages when enrichment relations are available). Edges
+are undirected and stored as integer-indexed CSR adjacency arrays.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import org_json
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+RAW_DATA_FILE = SCRIPT_DIR / 'org-graph-raw.json'
+
+# Node kinds, stored as small integers in OrgGraph.kinds
+NODE_KINDS = ('repository', 'parent', 'language', 'topic', 'license', 'contributor', 'package')
+KIND_IDS = {kind: i for i, kind in enumerate(NODE_KINDS)}
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITERATIONS = 100
+
+# Pseudo-repositories at the median centrality added to every category, so a
+# category of one or two repositories cannot reach an extreme level on a
+# single outlier
+CATEGORY_PRIOR_SIZE = 10
+# Minimum shrunk mean PageRank percentile of a category's repositories for
+# each strategic importance level; 'medium' covers categories that cannot be
+# told apart from the median repository
+IMPORTANCE_THRESHOLDS = (
+    (60, 'critical'),
+    (52.5, 'high'),
+    (47.5, 'medium'),
+    (0, 'low'),
+)
+
+
+class OrgGraph:
+    """
+    Undirected organization graph in CSR form.
+
+    Attributes:
+        names: Node names, indexed by node id
+        kinds: int8 array of node kinds (see NODE_KINDS)
+        indptr: int64 array; neighbours of node i are indices[indptr[i]:indptr[i + 1]]
+        indices: int32 array of neighbour node ids
+    """
+
+    def __init__(self, names, kinds, indptr, indices):
+        self.names = names
+        self.kinds = kinds
+        self.indptr = indptr
+        self.indices = indices
+        self._ids = None
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        """Number of undirected edges."""
+        return len(self.indices) // 2
+
+    def node_id(self, kind, name):
+        """Return the id of a node, or None if it does not exist."""
+        if self._ids is None:
+            self._ids = {(int(k), n): i for i, (k, n) in enumerate(zip(self.kinds, self.names))}
+        return self._ids.get((KIND_IDS[kind], name))
+
+    def nodes_of_kind(self, kind):
+        """Return the ids of all nodes of a kind."""
+        return np.flatnonzero(self.kinds == KIND_IDS[kind])
+
+    def neighbors(self, node):
+        """Return the neighbour ids of a node."""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def degree(self):
+        """Return the degree of every node."""
+        return np.diff(self.indptr)
+
+    def _entry_rows(self):
+        """Return the source node of every CSR entry."""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), self.degree())
+
+    def pagerank(self, damping=PAGERANK_DAMPING, tol=PAGERANK_TOLERANCE, max_iter=PAGERANK_MAX_ITERATIONS):
+        """
+        Compute PageRank centrality by vectorized power iteration.
+
+        Isolated nodes redistribute their rank uniformly.
+
+        Returns:
+            float64 array of scores summing to 1
+        """
+        n = self.num_nodes
+        if n == 0:
+            return np.zeros(0)
+        degree = self.degree().astype(np.float64)
+        dangling = degree == 0
+        inv_degree = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+        rows = self._entry_rows()
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = (rank * inv_degree)[self.indices]
+            incoming = np.bincount(rows, weights=share, minlength=n)
+            new_rank = (1.0 - damping) / n + damping * (incoming + rank[dangling].sum() / n)
+            converged = np.abs(new_rank - rank).sum() < tol
+            rank = new_rank
+            if converged:
+                break
+        return rank
+
+    def connected_components(self):
+        """
+        Label connected components with vectorized min-label propagation.
+
+        Returns:
+            Tuple of (number of components, int array of component labels 0..k-1)
+        """
+        n = self.num_nodes
+        labels = np.arange(n, dtype=np.int64)
+        rows = self._entry_rows()
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, rows, labels[self.indices])
+            # Pointer jumping collapses label chains quickly
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                break
+        _, compact = np.unique(labels, return_inverse=True)
+        return int(compact.max()) + 1 if n else 0, compact
+
+    def k_hop(self, node, k):
+        """
+        Return the nodes within k hops of a node (excluding the node itself).
+
+        Args:
+            node: Start node id
+            k: Maximum number of hops
+
+        Returns:
+            Sorted int array of node ids
+        """
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[node] = True
+        frontier = np.array([node], dtype=np.int64)
+        for _ in range(k):
+            if frontier.size == 0:
+                break
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            # Offsets of every neighbour entry of every frontier node
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            candidates = np.unique(self.indices[offsets])
+            frontier = candidates[~visited[candidates]]
+            visited[frontier] = True
+        visited[node] = False
+        return np.flatnonzero(visited)
+
+
+class _GraphBuilder:
+    """Collects nodes and edges before freezing them into an OrgGraph."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.kinds = []
+        self.sources = []
+        self.targets = []
+
+    def node(self, kind, name):
+        key = (KIND_IDS[kind], name)
+        node_id = self.ids.get(key)
+        if node_id is None:
+            node_id = self.ids[key] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(KIND_IDS[kind])
+        return node_id
+
+    def edge(self, a, b):
+        if a != b:
+            self.sources.append(a)
+            self.targets.append(b)
+
+    def build(self):
+        n = len(self.names)
+        src = np.asarray(self.sources, dtype=np.int64)
+        dst = np.asarray(self.targets, dtype=np.int64)
+        # Symmetrize and drop duplicate edges
+        keys = np.unique(np.concatenate([src * n + dst, dst * n + src]))
+        rows = keys // n
+        cols = (keys % n).astype(np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        graph = OrgGraph(self.names, np.asarray(self.kinds, dtype=np.int8), indptr, cols)
+        graph._ids = self.ids
+        return graph
+
+
+def build_graph(repos, org_login=None, relations=None):
+    """
+    Build the organization graph from repository nodes.
+
+    In-org fork parents and dependencies link to their repository node when
+    that repository is in the snapshot; otherwise they become 'parent' and
+    'package' nodes named by nameWithOwner, like external ones.
+
+    Args:
+        repos: Iterable of repository node dictionaries (may be a stream)
+        org_login: Organization login, used to link in-org fork parents and dependencies
+        relations: Optional relations from org_enrich.build_relation_edges
+
+    Returns:
+        OrgGraph instance
+    """
+    builder = _GraphBuilder()
+    prefix = f"{org_login}/" if org_login else None
+    # (source id, nameWithOwner, fallback kind) of in-org links, resolved once
+    # every repository of the snapshot has a node
+    internal = []
+
+    for repo in repos:
+        if prefix is None and getattr(repos, 'organization', {}).get('login'):
+            # SnapshotStream exposes the organization login once streaming has started
+            prefix = f"{repos.organization['login']}/"
+        repo_id = builder.node('repository', repo.get('name', ''))
+
+        parent = (repo.get('parent') or {}).get('nameWithOwner')
+        if parent:
+            if prefix and parent.startswith(prefix):
+                internal.append((repo_id, parent, 'parent'))
+            else:
+                builder.edge(repo_id, builder.node('parent', parent))
+
+        languages = {lang['name'] for lang in (repo.get('languages') or {}).get('nodes') or []}
+        if repo.get('primaryLanguage'):
+            languages.add(repo['primaryLanguage']['name'])
+        for lang in languages:
+            builder.edge(repo_id, builder.node('language', lang))
+
+        for topic in (repo.get('repositoryTopics') or {}).get('nodes') or []:
+            if topic.get('topic'):
+                builder.edge(repo_id, builder.node('topic', topic['topic']['name']))
+
+        license_info = repo.get('licenseInfo')
+        if license_info and license_info.get('spdxId'):
+            builder.edge(repo_id, builder.node('license', license_info['spdxId']))
+
+    for edge in (relations or {}).get('edges', []):
+        if edge['type'] == 'contributes_to':
+            builder.edge(builder.node('contributor', edge['source']), builder.node('repository', edge['target']))
+        elif edge['type'] == 'depends_on':
+            source_id = builder.node('repository', edge['source'])
+            target = edge['target']
+            if prefix and target.startswith(prefix):
+                internal.append((source_id, target, 'package'))
+            else:
+                builder.edge(source_id, builder.node('package', target))
+
+    repository_kind = KIND_IDS['repository']
+    for source_id, target, fallback_kind in internal:
+        target_id = builder.ids.get((repository_kind, target[len(prefix):]))
+        if target_id is None:
+            target_id = builder.node(fallback_kind, target)
+        builder.edge(source_id, target_id)
+
+    return builder.build()
+
+
+def repository_scores(graph, scores):
+    """Return {repository name: score} for all repository nodes."""
+    repo_ids = graph.nodes_of_kind('repository')
+    return {graph.names[i]: float(scores[i]) for i in repo_ids}
+
+
+def strategic_importance(category_repos, repo_scores):
+    """
+    Derive strategic importance levels for categories from centrality.
+
+    A category is scored by the mean percentile rank of its repositories'
+    PageRank among all repositories, shrunk towards the median (50) by
+    CATEGORY_PRIOR_SIZE pseudo-repositories. Percentile ranks keep a few
+    extreme scores from dominating, and the shrinkage keeps small categories
+    near 'medium' unless they are consistently central or peripheral. The
+    score is then mapped to a level by IMPORTANCE_THRESHOLDS.
+
+    Args:
+        category_repos: Mapping of category key to repository names
+        repo_scores: Mapping of repository name to PageRank score
+
+    Returns:
+        Mapping of category key to (level, mean score); categories without
+        scored repositories are omitted
+    """
+    all_scores = np.sort(np.fromiter(repo_scores.values(), dtype=np.float64))
+    if all_scores.size == 0:
+        return {}
+
+    result = {}
+    for category, names in category_repos.items():
+        scores = np.array([repo_scores[name] for name in names if name in repo_scores], dtype=np.float64)
+        if scores.size == 0:
+            continue
+        # Mid-rank percentiles, so tied scores share one percentile
+        below = np.searchsorted(all_scores, scores, side='left')
+        at_or_below = np.searchsorted(all_scores, scores, side='right')
+        percentiles = (below + at_or_below) / 2 / all_scores.size * 100
+        shrunk = (percentiles.sum() + 50 * CATEGORY_PRIOR_SIZE) / (scores.size + CATEGORY_PRIOR_SIZE)
+        level = next(level for threshold, level in IMPORTANCE_THRESHOLDS if shrunk >= threshold)
+        result[category] = (level, float(scores.mean()))
+    return result
+
+
+def graph_summary(graph, scores=None, top=10):
+    """
+    Summarize graph size, components and the most central repositories.
+
+    Args:
+        graph: OrgGraph instance
+        scores: Optional precomputed PageRank scores
+        top: Number of central repositories to list
+
+    Returns:
+        JSON-serializable dictionary
+    """
+    if scores is None:
+        scores = graph.pagerank()
+    degree = graph.degree()
+    num_components, labels = graph.connected_components()
+    component_sizes = np.bincount(labels) if graph.num_nodes else np.zeros(0, dtype=np.int64)
+
+    repo_ids = graph.nodes_of_kind('repository')
+    ranked = repo_ids[np.argsort(-scores[repo_ids], kind='stable')][:top]
+
+    return {
+        'nodes': graph.num_nodes,
+        'edges': graph.num_edges,
+        'nodes_by_kind': {kind: int((graph.kinds == i).sum()) for i, kind in enumerate(NODE_KINDS)},
+        'connected_components': num_components,
+        'largest_component_size': int(component_sizes.max()) if component_sizes.size else 0,
+        'isolated_repositories': int((degree[repo_ids] == 0).sum()),
+        'most_central_repositories': [
+            {'name': graph.names[i], 'pagerank': round(float(scores[i]), 6), 'degree': int(degree[i])}
+            for i in ranked
+        ],
+    }
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Graph analytics over the organization snapshot.")
+    parser.add_argument('--input', type=Path, default=RAW_DATA_FILE, help="Snapshot to analyze")
+    parser.add_argument('--top', type=int, default=10, help="Number of central repositories to list (default: 10)")
+    parser.add_argument('--neighbors', metavar='REPO', help="List nodes within --hops of this repository")
+    parser.add_argument('--hops', type=int, default=1, help="Neighbourhood radius for --neighbors (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    from org_stream import SnapshotFormatError, SnapshotStream
+
+    args = parse_args(argv)
+    stream = SnapshotStream(args.input)
+    try:
+        graph = build_graph(stream)
+    except FileNotFoundError:
+        print(f"Error: File not found: {args.input}")
+        sys.exit(1)
+    except (SnapshotFormatError, json.JSONDecodeError) as e:
+        print(f"Error: Invalid JSON in {args.input}: {e}")
+        sys.exit(1)
+
+    if args.neighbors:
+        node = graph.node_id('repository', args.neighbors)
+        if node is None:
+            print(f"Error: Repository not found: {args.neighbors}")
+            sys.exit(1)
+        result = {
+            'repository': args.neighbors,
+            'hops': args.hops,
+            'neighbors': [
+                {'name': graph.names[i], 'kind': NODE_KINDS[graph.kinds[i]]}
+                for i in graph.k_hop(node, args.hops)
+            ],
+        }
+    else:
+        result = graph_summary(graph, top=args.top)
+    org_json.write_stdout(result)
+
+
+if __name__ == "__main__":
+    main()
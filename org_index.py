@@ -0,0 +1,915 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Search Index
+Persistent inverted index over repository names, descriptions, topics and
+languages, with boolean and prefix search.
+
+The index is a single binary file that is memory-mapped at query time:
+
+    header       magic, version and the (offset, length) of each section
+    meta         small JSON object (organization, name prefix, build time,
+                 deleted document and garbage byte counts)
+    documents    repository names, an 8-byte fingerprint of the indexed
+                 fields of each repository and a deleted flag
+    dictionary   fixed-size term records sorted by the terms' UTF-8 bytes, so
+                 exact and prefix lookups are binary searches over the map
+    postings     per term: ascending document ids as varint deltas, each
+                 followed by a field bitmask and a varint term frequency
+
+Repository names are split on punctuation, camelCase and digit boundaries,
+and compounds starting with the organization's name prefix (see
+org_profiles) are split too, so "cogpilot.jl" is found by "cog", "pilot",
+"cogpilot" and "jl".
+
+Updating an existing index re-tokenizes only repositories whose indexed
+fields changed, and copies everything else byte for byte. A changed or
+removed repository is flagged deleted and skipped at query time, and a
+changed one is appended as a new document; posting lists that gain entries
+are moved to the end of the postings section with the new entries appended.
+Once deleted documents or moved-away posting bytes make up too much of the
+file, the update compacts the index instead.
+
+Usage:
+    python org_index.py build [--input org-graph-raw.json]
+    python org_index.py search 'llama OR whisper' [--limit 10] [--format json]
+    python org_index.py search 'lang:python topic:ai* -archived'
+"""
+
+import argparse
+import bisect
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import org_json
+from org_profiles import load_profile
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+RAW_DATA_FILE = SCRIPT_DIR / 'org-graph-raw.json'
+INDEX_FILE = SCRIPT_DIR / 'org-graph-index.bin'
+
+INDEX_MAGIC = b'OGIX'
+INDEX_VERSION = 2
+SECTIONS = ('meta', 'doc_offsets', 'doc_names', 'doc_fingerprints', 'doc_deleted',
+            'terms', 'term_records', 'postings')
+_HEADER = struct.Struct('<4sI' + 'QQ' * len(SECTIONS))
+# Term record: term offset and length in `terms`, posting list offset and
+# length in `postings`, number of entries and the last document id
+_TERM_RECORD = struct.Struct('<IIIIII')
+FINGERPRINT_SIZE = 8
+
+# An update compacts the index once deleted documents exceed this share of all
+# documents, or moved-away posting bytes exceed this share of the postings
+COMPACT_RATIO = 0.25
+
+# Indexed fields: (name, bit in the posting field mask, ranking weight)
+FIELDS = (
+    ('name', 1, 3.0),
+    ('description', 2, 1.0),
+    ('topic', 4, 2.0),
+    ('language', 8, 1.5),
+)
+FIELD_BITS = {name: bit for name, bit, _ in FIELDS}
+FIELD_WEIGHTS = {bit: weight for _, bit, weight in FIELDS}
+ALL_FIELDS = sum(FIELD_BITS.values())
+# Ranking weight of every field mask (sum of the weights of its fields)
+_MASK_WEIGHTS = [sum(w for bit, w in FIELD_WEIGHTS.items() if mask & bit) for mask in range(ALL_FIELDS + 1)]
+# Field prefixes accepted in queries (e.g. "lang:rust")
+FIELD_ALIASES = {'name': 'name', 'description': 'description', 'desc': 'description',
+                 'topic': 'topic', 'language': 'language', 'lang': 'language'}
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from in into is it its of on or that the this to with'.split())
+
+_WORD = re.compile(r'[a-z0-9][a-z0-9+#]*')
+_NAME_PART = re.compile(r'[^A-Za-z0-9+#]+')
+_CAMEL = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+_QUERY_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+
+
+class IndexFormatError(ValueError):
+    """Raised when an index file is missing sections or has the wrong format."""
+
+
+class QueryError(ValueError):
+    """Raised for malformed search queries."""
+
+
+def _name_tokens(name, prefix):
+    """Return the search terms of a repository name."""
+    tokens = {name.lower()}
+    for part in _NAME_PART.split(name):
+        if not part:
+            continue
+        lowered = part.lower()
+        tokens.add(lowered)
+        tokens.update(piece.lower() for piece in _CAMEL.findall(part))
+        if prefix and lowered.startswith(prefix) and len(lowered) > len(prefix):
+            tokens.add(prefix)
+            tokens.add(lowered[len(prefix):])
+    return tokens
+
+
+def _text_tokens(text):
+    """Return the search terms of free text, with repeats."""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _indexed_fields(repo):
+    """Return (name, description, topics, languages) of a repository node."""
+    topics = [t['topic']['name'] for t in (repo.get('repositoryTopics') or {}).get('nodes') or [] if t.get('topic')]
+    languages = [lang['name'] for lang in (repo.get('languages') or {}).get('nodes') or []]
+    if repo.get('primaryLanguage') and repo['primaryLanguage']['name'] not in languages:
+        languages.insert(0, repo['primaryLanguage']['name'])
+    return repo.get('name', ''), repo.get('description') or '', topics, languages
+
+
+def repository_fingerprint(repo):
+    """Return a short digest of the fields of a repository that are indexed."""
+    encoded = json.dumps(_indexed_fields(repo), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=FINGERPRINT_SIZE).digest()
+
+
+def tokenize_repository(repo, prefix=''):
+    """
+    Tokenize the indexed fields of a repository node.
+
+    Args:
+        repo: Repository node dictionary
+        prefix: Organization name prefix whose compounds are split
+
+    Returns:
+        Dictionary of term -> (field mask, term frequency)
+    """
+    name, description, topics, languages = _indexed_fields(repo)
+    terms = {}
+
+    def add(term, bit, count=1):
+        mask, tf = terms.get(term, (0, 0))
+        terms[term] = (mask | bit, tf + count)
+
+    for term in _name_tokens(name, prefix):
+        add(term, FIELD_BITS['name'])
+    for term in _text_tokens(description):
+        add(term, FIELD_BITS['description'])
+    for topic in topics:
+        add(topic.lower(), FIELD_BITS['topic'])
+        for term in _text_tokens(topic):
+            if term != topic.lower():
+                add(term, FIELD_BITS['topic'])
+    for language in languages:
+        add(language.lower(), FIELD_BITS['language'])
+        for term in _text_tokens(language):
+            if term != language.lower():
+                add(term, FIELD_BITS['language'])
+    return terms
+
+
+def _decode_varint(buf, pos):
+    """Decode an unsigned LEB128 varint at pos, returning (value, next offset)."""
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        pos += 1
+        byte = buf[pos]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos + 1
+        shift += 7
+
+
+def _encode_varint(value, out):
+    """Append value to a bytearray as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode_postings(entries, out, previous=0):
+    """
+    Append (doc id, field mask, tf) entries in ascending doc order to out.
+
+    Args:
+        entries: Entries sorted by document id
+        out: bytearray receiving the encoded entries
+        previous: Document id the first delta is relative to
+
+    Returns:
+        Last document id written (previous if entries is empty)
+    """
+    for doc, mask, tf in entries:
+        _encode_varint(doc - previous, out)
+        out.append(mask)
+        _encode_varint(tf, out)
+        previous = doc
+    return previous
+
+
+def _pack_offsets(offsets):
+    """Pack a list of uint32 offsets."""
+    return struct.pack(f'<{len(offsets)}I', *offsets)
+
+
+def _write_sections(filepath, sections):
+    """Write the header and sections to a temporary file and rename it over filepath."""
+    offset = _HEADER.size
+    layout = []
+    for name in SECTIONS:
+        layout.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+    tmp_path = Path(filepath).with_name(Path(filepath).name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *layout))
+        for name in SECTIONS:
+            f.write(sections[name])
+    os.replace(tmp_path, filepath)
+
+
+def _write_index(filepath, meta, names, fingerprints, postings):
+    """
+    Serialize a compact index (no deleted documents) and replace filepath atomically.
+
+    Args:
+        filepath: Index file path
+        meta: JSON-serializable metadata
+        names: Repository names, indexed by document id
+        fingerprints: 8-byte fingerprints, indexed by document id
+        postings: Dictionary of term -> list of (doc id, field mask, tf)
+    """
+    meta = dict(meta, deleted=0, garbage_bytes=0)
+    sections = {'meta': org_json.dumps(meta)}
+
+    doc_offsets = [0]
+    doc_names = bytearray()
+    for name in names:
+        doc_names += name.encode('utf-8')
+        doc_offsets.append(len(doc_names))
+    sections['doc_offsets'] = _pack_offsets(doc_offsets)
+    sections['doc_names'] = bytes(doc_names)
+    sections['doc_fingerprints'] = b''.join(fingerprints)
+    sections['doc_deleted'] = bytes(len(names))
+
+    encoded_terms = sorted((term.encode('utf-8'), term) for term in postings)
+    term_blob = bytearray()
+    records = bytearray()
+    blob = bytearray()
+    for encoded, term in encoded_terms:
+        entries = sorted(postings[term])
+        start = len(blob)
+        last = _encode_postings(entries, blob)
+        records += _TERM_RECORD.pack(len(term_blob), len(encoded), start, len(blob) - start, len(entries), last)
+        term_blob += encoded
+    sections['terms'] = bytes(term_blob)
+    sections['term_records'] = bytes(records)
+    sections['postings'] = bytes(blob)
+    _write_sections(filepath, sections)
+
+
+class _Table:
+    """Sequence view of variable-length byte strings stored as offsets + blob."""
+
+    def __init__(self, buf, offsets, blob):
+        self._buf = buf
+        self._offsets = offsets[0]
+        self._blob = blob[0]
+        self._count = offsets[1] // 4 - 1 if offsets[1] else 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        start, end = struct.unpack_from('<II', self._buf, self._offsets + 4 * i)
+        return self._buf[self._blob + start:self._blob + end]
+
+
+class _Terms:
+    """Sequence view of the terms in dictionary order, read through their records."""
+
+    def __init__(self, buf, records, blob):
+        self._buf = buf
+        self._records = records[0]
+        self._blob = blob[0]
+        self._count = records[1] // _TERM_RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        start, length = struct.unpack_from('<II', self._buf, self._records + i * _TERM_RECORD.size)
+        return self._buf[self._blob + start:self._blob + start + length]
+
+
+class SearchIndex:
+    """
+    Read-only, memory-mapped view of an index file.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, filepath=INDEX_FILE):
+        """
+        Open an index file.
+
+        Raises:
+            FileNotFoundError: If the index does not exist
+            IndexFormatError: If the file is not a valid index
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # Empty file
+            self._file.close()
+            raise IndexFormatError(f"Empty index file: {filepath}") from e
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise IndexFormatError(f"Truncated index file: {filepath}")
+        magic, version, *layout = _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise IndexFormatError(f"Not a version {INDEX_VERSION} index file: {filepath}")
+        self._sections = {name: (layout[2 * i], layout[2 * i + 1]) for i, name in enumerate(SECTIONS)}
+        if max(start + length for start, length in self._sections.values()) > len(self._map):
+            self.close()
+            raise IndexFormatError(f"Truncated index file: {filepath}")
+
+        self.meta = org_json.loads(self.section('meta'))
+        self.names = _Table(self._map, self._sections['doc_offsets'], self._sections['doc_names'])
+        self.terms = _Terms(self._map, self._sections['term_records'], self._sections['terms'])
+        self._records = self._sections['term_records'][0]
+        self._postings = self._sections['postings'][0]
+        # Deleted flags, only consulted when some document is deleted
+        self._deleted = self.section('doc_deleted') if self.meta.get('deleted') else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap and close the index file."""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def section(self, name):
+        """Return the raw bytes of a section."""
+        start, length = self._sections[name]
+        return self._map[start:start + length]
+
+    @property
+    def num_slots(self):
+        """Number of document ids, including deleted documents."""
+        return len(self.names)
+
+    @property
+    def num_documents(self):
+        """Number of live (not deleted) documents."""
+        return len(self.names) - self.meta.get('deleted', 0)
+
+    @property
+    def num_terms(self):
+        return len(self.terms)
+
+    def is_deleted(self, doc):
+        """Return True if a document id has been deleted by an update."""
+        return self._deleted is not None and self._deleted[doc] != 0
+
+    def live_documents(self):
+        """Return the ids of all live documents."""
+        if self._deleted is None:
+            return range(self.num_slots)
+        return [doc for doc, flag in enumerate(self._deleted) if not flag]
+
+    def document_name(self, doc):
+        """Return the repository name of a document id."""
+        return self.names[doc].decode('utf-8')
+
+    def fingerprint(self, doc):
+        """Return the stored fingerprint of a document id."""
+        start = self._sections['doc_fingerprints'][0] + doc * FINGERPRINT_SIZE
+        return self._map[start:start + FINGERPRINT_SIZE]
+
+    def term_id(self, term):
+        """Return the id of an exact term, or None."""
+        key = term.encode('utf-8')
+        i = bisect.bisect_left(self.terms, key)
+        if i < len(self.terms) and self.terms[i] == key:
+            return i
+        return None
+
+    def prefix_term_ids(self, prefix):
+        """Return the ids of all terms starting with prefix."""
+        key = prefix.encode('utf-8')
+        i = bisect.bisect_left(self.terms, key)
+        ids = []
+        while i < len(self.terms) and self.terms[i].startswith(key):
+            ids.append(i)
+            i += 1
+        return ids
+
+    def term_record(self, term_id):
+        """Return (term offset, term length, postings offset, postings length, entries, last doc)."""
+        return _TERM_RECORD.unpack_from(self._map, self._records + term_id * _TERM_RECORD.size)
+
+    def document_frequency(self, term_id):
+        """Return the number of live documents containing a term."""
+        if self._deleted is None:
+            return self.term_record(term_id)[4]
+        return sum(1 for _ in self.postings(term_id))
+
+    def postings(self, term_id):
+        """Yield (doc id, field mask, tf) for each live document containing a term."""
+        _, _, offset, _, count, _ = self.term_record(term_id)
+        buf = self._map
+        deleted = self._deleted
+        pos = self._postings + offset
+        doc = 0
+        for _ in range(count):
+            gap, pos = _decode_varint(buf, pos)
+            doc += gap
+            mask = buf[pos]
+            tf = buf[pos + 1]
+            pos += 2
+            if tf >= 0x80:
+                tf, pos = _decode_varint(buf, pos - 1)
+            if deleted is None or not deleted[doc]:
+                yield doc, mask, tf
+
+    def _match_term(self, term, fields, prefix):
+        """Return {doc id: score} for one query term."""
+        term_ids = self.prefix_term_ids(term) if prefix else [i for i in [self.term_id(term)] if i is not None]
+        n = self.num_documents
+        scores = {}
+        get = scores.get
+        for term_id in term_ids:
+            if self._deleted is None:
+                entries = self.postings(term_id)
+                df = self.term_record(term_id)[4]
+            else:
+                entries = list(self.postings(term_id))
+                df = len(entries)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            weights = [idf * _MASK_WEIGHTS[mask & fields] for mask in range(ALL_FIELDS + 1)]
+            for doc, mask, tf in entries:
+                weight = weights[mask]
+                if weight:
+                    scores[doc] = get(doc, 0.0) + (weight if tf == 1 else weight * (1 + math.log(tf)))
+        return scores
+
+    def search(self, query, limit=10):
+        """
+        Run a boolean query and return ranked results.
+
+        Terms are combined with AND by default; OR, NOT (or a leading '-'),
+        parentheses, field prefixes (name:, desc:, topic:, lang:) and
+        trailing '*' prefix matching are supported.
+
+        Args:
+            query: Query string
+            limit: Maximum number of results, at least 1 (None for all)
+
+        Returns:
+            List of (repository name, score), best first
+
+        Raises:
+            QueryError: If the query is malformed
+            ValueError: If limit is less than 1
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        tokens = _QUERY_TOKEN.findall(query)
+        if not tokens:
+            raise QueryError("Empty query")
+        parser = _QueryParser(tokens, self)
+        scores, negated = parser.parse()
+        if negated:
+            scores = {doc: 0.0 for doc in self.live_documents() if doc not in scores}
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        else:
+            # Select the best scores first; names only break ties among them
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: -item[1])
+            cutoff = best[-1][1] if len(best) == limit else None
+            if cutoff is not None:
+                best = [item for item in scores.items() if item[1] >= cutoff]
+            ranked = sorted(best, key=lambda item: (-item[1], self.names[item[0]]))[:limit]
+        return [(self.document_name(doc), round(score, 4)) for doc, score in ranked]
+
+
+class _QueryParser:
+    """
+    Recursive-descent parser that evaluates a query as it parses.
+
+    Each node evaluates to (scores, negated): when negated is true the node
+    matches every document *except* those in scores, which keeps NOT cheap
+    inside AND.
+    """
+
+    def __init__(self, tokens, index):
+        self.tokens = tokens
+        self.pos = 0
+        self.index = index
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def parse(self):
+        result = self._or()
+        if self._peek() is not None:
+            raise QueryError(f"Unexpected {self._peek()!r}")
+        return result
+
+    def _or(self):
+        scores, negated = self._and()
+        while self._peek() == 'OR':
+            self.pos += 1
+            other, other_negated = self._and()
+            if not negated and not other_negated:
+                scores = _merge(scores, other)
+            elif negated and other_negated:
+                scores, negated = {doc: 0.0 for doc in scores if doc in other}, True
+            elif negated:
+                scores = {doc: 0.0 for doc in scores if doc not in other}
+            else:
+                scores, negated = {doc: 0.0 for doc in other if doc not in scores}, True
+        return scores, negated
+
+    def _and(self):
+        positives = []
+        excluded = {}
+        while self._peek() not in (None, ')', 'OR'):
+            if self._peek() == 'AND':
+                self.pos += 1
+                continue
+            scores, negated = self._not()
+            if negated:
+                excluded.update(scores)
+            else:
+                positives.append(scores)
+        if not positives and not excluded:
+            raise QueryError("Expected a search term")
+        if not positives:
+            return excluded, True
+        positives.sort(key=len)
+        result = positives[0]
+        for other in positives[1:]:
+            result = {doc: score + other[doc] for doc, score in result.items() if doc in other}
+        return {doc: score for doc, score in result.items() if doc not in excluded}, False
+
+    def _not(self):
+        token = self._peek()
+        if token is None:
+            raise QueryError("Expected a search term")
+        if token in ('NOT', '-'):
+            # A bare '-' is a leading '-' split from a parenthesis, as in "-(a OR b)"
+            self.pos += 1
+            scores, negated = self._not()
+            return scores, not negated
+        if token.startswith('-'):
+            self.tokens[self.pos] = token[1:]
+            scores, negated = self._not()
+            return scores, not negated
+        return self._atom()
+
+    def _atom(self):
+        token = self._peek()
+        if token == '(':
+            self.pos += 1
+            result = self._or()
+            if self._peek() != ')':
+                raise QueryError("Missing ')'")
+            self.pos += 1
+            return result
+        if token == ')':
+            raise QueryError("Unexpected ')'")
+        self.pos += 1
+        fields = ALL_FIELDS
+        field, sep, term = token.partition(':')
+        if sep and field.lower() in FIELD_ALIASES:
+            fields = FIELD_BITS[FIELD_ALIASES[field.lower()]]
+        else:
+            term = token
+        term = term.lower()
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if not term:
+            raise QueryError(f"Empty term in {token!r}")
+        return self.index._match_term(term, fields, prefix), False
+
+
+def _merge(a, b):
+    """Return the union of two score dictionaries, summing shared scores."""
+    if len(a) < len(b):
+        a, b = b, a
+    merged = dict(a)
+    for doc, score in b.items():
+        merged[doc] = merged.get(doc, 0.0) + score
+    return merged
+
+
+def _appended_sections(previous, meta, deleted, names, fingerprints, postings):
+    """
+    Build the sections of an updated index without decoding existing postings.
+
+    Every section of the previous index is copied byte for byte. New
+    documents are appended, deleted ones flagged, posting lists that gain
+    entries are moved to the end of the postings section with the entries
+    appended, and new terms are spliced into the sorted term records.
+
+    Args:
+        previous: SearchIndex being updated
+        meta: Metadata of the updated index (deleted and garbage counts are added)
+        deleted: Document ids of the previous index to flag as deleted
+        names: Names of the new documents, numbered from previous.num_slots
+        fingerprints: Fingerprints of the new documents
+        postings: Dictionary of term -> list of (doc id, field mask, tf) for the new documents
+
+    Returns:
+        Tuple of (sections dictionary, meta)
+    """
+    sections = {}
+    old_names = previous.section('doc_names')
+    new_names = bytearray()
+    new_offsets = []
+    for name in names:
+        new_names += name.encode('utf-8')
+        new_offsets.append(len(old_names) + len(new_names))
+    sections['doc_offsets'] = previous.section('doc_offsets') + _pack_offsets(new_offsets)
+    sections['doc_names'] = old_names + bytes(new_names)
+    sections['doc_fingerprints'] = previous.section('doc_fingerprints') + b''.join(fingerprints)
+    flags = bytearray(previous.section('doc_deleted'))
+    flags += bytes(len(names))
+    for doc in deleted:
+        flags[doc] = 1
+    sections['doc_deleted'] = bytes(flags)
+
+    size = _TERM_RECORD.size
+    records = bytearray(previous.section('term_records'))
+    terms_blob = bytearray(previous.section('terms'))
+    blob = bytearray(previous.section('postings'))
+    garbage = previous.meta.get('garbage_bytes', 0)
+    new_terms = []
+    for term, entries in postings.items():
+        encoded = term.encode('utf-8')
+        term_id = previous.term_id(term)
+        if term_id is None:
+            new_terms.append((encoded, entries))
+            continue
+        term_start, term_length, offset, length, count, last = previous.term_record(term_id)
+        start = len(blob)
+        blob += blob[offset:offset + length]
+        last = _encode_postings(entries, blob, last)
+        _TERM_RECORD.pack_into(records, term_id * size, term_start, term_length, start, len(blob) - start,
+                               count + len(entries), last)
+        garbage += length
+
+    pieces = []
+    copied = 0
+    for encoded, entries in sorted(new_terms):
+        position = bisect.bisect_left(previous.terms, encoded)
+        pieces.append(records[copied * size:position * size])
+        copied = position
+        start = len(blob)
+        last = _encode_postings(entries, blob)
+        pieces.append(_TERM_RECORD.pack(len(terms_blob), len(encoded), start, len(blob) - start, len(entries), last))
+        terms_blob += encoded
+    pieces.append(records[copied * size:])
+    sections['term_records'] = b''.join(pieces)
+    sections['terms'] = bytes(terms_blob)
+    sections['postings'] = bytes(blob)
+
+    meta = dict(meta, deleted=previous.meta.get('deleted', 0) + len(deleted), garbage_bytes=garbage)
+    sections['meta'] = org_json.dumps(meta)
+    return sections, meta
+
+
+def _compacted(previous, deleted, names, fingerprints, postings):
+    """
+    Merge the live documents of the previous index with new documents.
+
+    Live documents keep their order and are renumbered from 0, followed by
+    the new documents. This decodes every posting list of the previous index.
+
+    Returns:
+        Tuple of (names, fingerprints, postings) for _write_index
+    """
+    deleted = set(deleted)
+    live = [doc for doc in previous.live_documents() if doc not in deleted]
+    remap = {old: new for new, old in enumerate(live)}
+    merged = {}
+    for term_id in range(previous.num_terms):
+        entries = [(remap[doc], mask, tf) for doc, mask, tf in previous.postings(term_id) if doc in remap]
+        if entries:
+            merged[bytes(previous.terms[term_id]).decode('utf-8')] = entries
+    shift = len(live) - previous.num_slots
+    for term, entries in postings.items():
+        merged.setdefault(term, []).extend((doc + shift, mask, tf) for doc, mask, tf in entries)
+    all_names = [previous.document_name(doc) for doc in live] + names
+    all_fingerprints = [bytes(previous.fingerprint(doc)) for doc in live] + fingerprints
+    return all_names, all_fingerprints, merged
+
+
+def update_index(repos, login=None, filepath=INDEX_FILE, rebuild=False):
+    """
+    Build or incrementally update the search index.
+
+    When an index for the same organization and name prefix exists, only new
+    or changed repositories are tokenized, and the existing postings are
+    copied without being decoded (see the module docstring). If nothing
+    changed, the file is left untouched.
+
+    Args:
+        repos: Iterable of repository node dictionaries (may be a stream)
+        login: Organization login (read from a SnapshotStream if omitted)
+        filepath: Index file path
+        rebuild: Ignore any existing index
+
+    Returns:
+        Dictionary with document, term, reindexed, reused and removed counts
+        and the update mode ('rebuild', 'append', 'compact' or 'unchanged')
+    """
+    previous = None
+    if not rebuild:
+        try:
+            previous = SearchIndex(filepath)
+        except (FileNotFoundError, IndexFormatError):
+            previous = None
+
+    try:
+        names = []
+        fingerprints = []
+        postings = {}
+        deleted = []
+        reused = 0
+        prefix = None
+        previous_docs = None
+        base = 0
+        for repo in repos:
+            if prefix is None:
+                # SnapshotStream exposes the organization login once streaming has started
+                login = login or getattr(repos, 'organization', {}).get('login')
+                prefix = load_profile(login).get('prefix', '').lower()
+                if previous is not None and previous.meta.get('organization') == login \
+                        and previous.meta.get('prefix') == prefix:
+                    previous_docs = {previous.document_name(doc): doc for doc in previous.live_documents()}
+                    base = previous.num_slots
+
+            name = repo.get('name', '')
+            fingerprint = repository_fingerprint(repo)
+            if previous_docs is not None:
+                old_doc = previous_docs.pop(name, None)
+                if old_doc is not None:
+                    if previous.fingerprint(old_doc) == fingerprint:
+                        reused += 1
+                        continue
+                    deleted.append(old_doc)
+            doc = base + len(names)
+            names.append(name)
+            fingerprints.append(fingerprint)
+            for term, (mask, tf) in tokenize_repository(repo, prefix).items():
+                postings.setdefault(term, []).append((doc, mask, tf))
+
+        meta = {
+            'organization': login,
+            'prefix': prefix,
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'fields': [name for name, _, _ in FIELDS],
+        }
+        sections = None
+        removed = 0
+        if previous_docs is None:
+            mode = 'rebuild'
+        else:
+            # Repositories not seen in this snapshot were removed
+            removed = len(previous_docs)
+            deleted.extend(previous_docs.values())
+            total_deleted = previous.meta.get('deleted', 0) + len(deleted)
+            if not names and not deleted:
+                mode = 'unchanged'
+                documents, terms = previous.num_documents, previous.num_terms
+            elif total_deleted > COMPACT_RATIO * (base + len(names)):
+                mode = 'compact'
+            else:
+                mode = 'append'
+                sections, meta = _appended_sections(previous, meta, deleted, names, fingerprints, postings)
+                if meta['garbage_bytes'] > COMPACT_RATIO * len(sections['postings']):
+                    mode = 'compact'
+                    sections = None
+            if mode == 'append':
+                documents = previous.num_documents - len(deleted) + len(names)
+                terms = len(sections['term_records']) // _TERM_RECORD.size
+            elif mode == 'compact':
+                all_names, all_fingerprints, all_postings = _compacted(previous, deleted, names, fingerprints,
+                                                                       postings)
+    finally:
+        if previous is not None:
+            previous.close()
+
+    if mode == 'rebuild':
+        _write_index(filepath, meta, names, fingerprints, postings)
+        documents, terms = len(names), len(postings)
+    elif mode == 'compact':
+        _write_index(filepath, meta, all_names, all_fingerprints, all_postings)
+        documents, terms = len(all_names), len(all_postings)
+    elif mode == 'append':
+        _write_sections(filepath, sections)
+    return {
+        'documents': documents,
+        'terms': terms,
+        'reindexed': len(names),
+        'reused': reused,
+        'removed': removed,
+        'mode': mode,
+    }
+
+
+def _positive_int(value):
+    """argparse type for integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Build and query the repository search index.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build or update the index from a snapshot")
+    build_parser.add_argument('--input', type=Path, default=RAW_DATA_FILE, help="Snapshot to index")
+    build_parser.add_argument('--index', type=Path, default=INDEX_FILE, help="Index file")
+    build_parser.add_argument('--rebuild', action='store_true', help="Rebuild from scratch")
+
+    search_parser = subparsers.add_parser('search', help="Search repositories")
+    search_parser.add_argument('query', help="Query, e.g. 'llama OR whisper', 'lang:rust -archive*', 'cog*'")
+    search_parser.add_argument('--index', type=Path, default=INDEX_FILE, help="Index file")
+    search_parser.add_argument('--limit', type=_positive_int, default=10, help="Maximum results (default: 10)")
+    search_parser.add_argument('--format', choices=('text', 'json'), default='text',
+                               help="Output format (default: text)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    from org_stream import SnapshotFormatError, SnapshotStream
+
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        try:
+            stats = update_index(SnapshotStream(args.input), filepath=args.index, rebuild=args.rebuild)
+        except FileNotFoundError:
+            print(f"Error: File not found: {args.input}")
+            sys.exit(1)
+        except (SnapshotFormatError, org_json.JSONDecodeError) as e:
+            print(f"Error: Invalid JSON in {args.input}: {e}")
+            sys.exit(1)
+        print(f"Indexed {stats['documents']} repositories ({stats['terms']} terms) in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms: {stats['reindexed']} tokenized, "
+              f"{stats['reused']} reused, {stats['removed']} removed ({stats['mode']})")
+        if stats['mode'] != 'unchanged':
+            print(f"Index saved to: {args.index}")
+        return
+
+    try:
+        with SearchIndex(args.index) as index:
+            start = time.perf_counter()
+            results = index.search(args.query, limit=args.limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+    except FileNotFoundError:
+        print(f"Error: Index not found: {args.index} (run 'python org_index.py build' first)")
+        sys.exit(1)
+    except (IndexFormatError, QueryError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.format == 'json':
+        org_json.write_stdout({'query': args.query, 'elapsed_ms': round(elapsed_ms, 3),
+                               'results': [{'name': name, 'score': score} for name, score in results]})
+    else:
+        for name, score in results:
+            print(f"{score:8.3f}  {name}")
+        print(f"\n{len(results)} result(s) in {elapsed_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
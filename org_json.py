@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization JSON Codec
+Single JSON encode/decode layer shared by the fetch, process and load paths.
+
+orjson is used when it is installed and the stdlib `json` module otherwise
+(set ORG_JSON_BACKEND=json to force the fallback). Files are passed to the
+decoder as a memoryview of the memory-mapped file rather than read into a
+bytes copy. orjson decodes that view directly; the stdlib `json` module only
+accepts text, so the fallback makes one decoded str copy of the document.
+Documents are written compactly unless pretty output is requested. The
+cyclic garbage collector is paused while decoding: a parsed document has no
+reference cycles, and collections triggered by the millions of new
+containers otherwise dominate decode time on large snapshots.
+
+Streaming reads in org_stream.py stay on the stdlib decoder even when orjson
+is installed. orjson only decodes complete slices, and finding the end of
+each repository node first makes it about 6x slower than the stdlib's
+`raw_decode` over a read window.
+
+Usage:
+    python org_json.py                       # Benchmark on org-graph-raw.json
+    python org_json.py --synthetic 100000    # Also benchmark a 100k-repo snapshot
+"""
+
+import argparse
+import gc
+import json
+import mmap
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+RAW_DATA_FILE = SCRIPT_DIR / 'org-graph-raw.json'
+
+BACKENDS = ('orjson', 'json') if orjson else ('json',)
+BACKEND = os.environ.get('ORG_JSON_BACKEND') or BACKENDS[0]
+if BACKEND not in BACKENDS:
+    print(f"Warning: JSON backend {BACKEND!r} is not available, using {BACKENDS[-1]!r}", file=sys.stderr)
+    BACKEND = BACKENDS[-1]
+
+# Raised for malformed documents by every backend (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+
+@contextmanager
+def _gc_paused():
+    """Disable the cyclic garbage collector for the duration of the block."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _loads_json(data):
+    """
+    Decode with the stdlib codec; accepts str or any bytes-like object.
+
+    Bytes are first decoded into one str copy of the whole document, since
+    `json.loads` cannot parse from a memoryview.
+    """
+    if not isinstance(data, str):
+        try:
+            data = str(data, 'utf-8')
+        except UnicodeDecodeError as e:
+            raise JSONDecodeError(f"Invalid UTF-8: {e.reason}", '', e.start) from e
+    return json.loads(data)
+
+
+def _dumps_json(value, pretty=False, sort_keys=False):
+    """Encode with the stdlib codec to UTF-8 bytes."""
+    if pretty:
+        text = json.dumps(value, indent=2, sort_keys=sort_keys, ensure_ascii=False)
+    else:
+        text = json.dumps(value, separators=(',', ':'), sort_keys=sort_keys, ensure_ascii=False)
+    return text.encode('utf-8')
+
+
+def _dumps_orjson(value, pretty=False, sort_keys=False):
+    """Encode with orjson to UTF-8 bytes."""
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(value, option=option)
+
+
+_LOADS = {'json': _loads_json}
+_DUMPS = {'json': _dumps_json}
+if orjson:
+    _LOADS['orjson'] = orjson.loads
+    _DUMPS['orjson'] = _dumps_orjson
+
+
+def loads(data, backend=None):
+    """
+    Decode a JSON document.
+
+    Args:
+        data: bytes, bytearray, memoryview or str
+        backend: Backend name (defaults to BACKEND)
+
+    Raises:
+        JSONDecodeError: If the document is not valid JSON
+    """
+    with _gc_paused():
+        return _LOADS[backend or BACKEND](data)
+
+
+def dumps(value, pretty=False, sort_keys=False, backend=None):
+    """
+    Encode a value as UTF-8 JSON bytes.
+
+    Args:
+        value: JSON-serializable value
+        pretty: Indent with two spaces instead of writing compactly
+        sort_keys: Sort object keys
+        backend: Backend name (defaults to BACKEND)
+    """
+    return _DUMPS[backend or BACKEND](value, pretty=pretty, sort_keys=sort_keys)
+
+
+def load(filepath, backend=None):
+    """
+    Decode a JSON file without reading it into a decoded string.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        JSONDecodeError: If the file is not valid JSON
+    """
+    with open(filepath, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return loads(b'', backend=backend)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            with memoryview(buf) as view:
+                return loads(view, backend=backend)
+
+
+def dump(value, filepath, pretty=False, sort_keys=False, backend=None):
+    """Encode a value and write it to a file (compact unless pretty)."""
+    data = dumps(value, pretty=pretty, sort_keys=sort_keys, backend=backend)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+        if pretty:
+            f.write(b'\n')
+
+
+def write_stdout(value, pretty=True):
+    """Write a value as JSON to standard output, followed by a newline."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumps(value, pretty=pretty) + b'\n')
+    sys.stdout.buffer.flush()
+
+
+def synthetic_snapshot(template_nodes, count):
+    """
+    Build a snapshot with `count` repositories cycled from template nodes.
+
+    Names are made unique so the result looks like one large organization.
+    """
+    nodes = []
+    for i in range(count):
+        node = dict(template_nodes[i % len(template_nodes)])
+        node['name'] = f"{node.get('name', 'repo')}-{i}"
+        nodes.append(node)
+    return {'data': {'organization': {
+        'login': 'synthetic',
+        'membersWithRole': {'totalCount': 0},
+        'repositories': {'totalCount': count, 'nodes': nodes},
+    }}}
+
+
+def _best_time(func, repeat):
+    """Return the fastest of `repeat` timed calls of func (excluding freeing the result)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+    return best
+
+
+def benchmark(label, document, repeat=5):
+    """
+    Measure parse and serialize throughput of each backend on a document.
+
+    Returns:
+        List of result dictionaries, one per backend
+    """
+    compact = dumps(document)
+    pretty_bytes = dumps(document, pretty=True)
+    size_mb = len(pretty_bytes) / 1e6
+    results = []
+    for backend in BACKENDS:
+        parse = _best_time(lambda: loads(pretty_bytes, backend=backend), repeat)
+        serialize = _best_time(lambda: dumps(document, backend=backend), repeat)
+        serialize_pretty = _best_time(lambda: dumps(document, pretty=True, backend=backend), repeat)
+        results.append({
+            'document': label,
+            'backend': backend,
+            'size_mb': round(size_mb, 2),
+            'compact_size_mb': round(len(compact) / 1e6, 2),
+            'parse_mb_s': round(size_mb / parse, 1),
+            'serialize_mb_s': round(len(compact) / 1e6 / serialize, 1),
+            'serialize_pretty_mb_s': round(size_mb / serialize_pretty, 1),
+        })
+    return results
+
+
+def print_benchmark(results):
+    """Print benchmark results as a table."""
+    print(f"{'Document':<24} {'Backend':<8} {'Size MB':>8} {'Compact MB':>11} "
+          f"{'Parse MB/s':>11} {'Dump MB/s':>10} {'Pretty MB/s':>12}")
+    for r in results:
+        print(f"{r['document']:<24} {r['backend']:<8} {r['size_mb']:>8} {r['compact_size_mb']:>11} "
+              f"{r['parse_mb_s']:>11} {r['serialize_mb_s']:>10} {r['serialize_pretty_mb_s']:>12}")
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the JSON codec backends on organization snapshots.")
+    parser.add_argument('--input', type=Path, default=RAW_DATA_FILE, help="Snapshot to benchmark")
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[], metavar='REPOS',
+                        help="Also benchmark synthetic snapshots with this many repositories")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per measurement (default: 5)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    try:
+        snapshot = load(args.input)
+        template_nodes = snapshot['data']['organization']['repositories']['nodes']
+    except FileNotFoundError:
+        print(f"Error: File not found: {args.input}")
+        sys.exit(1)
+    except JSONDecodeError as e:
+        print(f"Error: Invalid JSON in {args.input}: {e}")
+        sys.exit(1)
+    except (KeyError, TypeError) as e:
+        print(f"Error: Missing expected key in snapshot: {e}")
+        sys.exit(1)
+
+    print(f"Backends: {', '.join(BACKENDS)} (default: {BACKEND})")
+    results = benchmark(args.input.name, snapshot, repeat=args.repeat)
+    for count in args.synthetic:
+        if template_nodes:
+            results.extend(benchmark(f"synthetic-{count}", synthetic_snapshot(template_nodes, count),
+                                     repeat=args.repeat))
+    print_benchmark(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Metrics
+Shared instrumentation for the fetch, analysis and visualization scripts.
+
+Records per-request latency histograms, GraphQL cost and rate-limit state,
+per-stage wall/CPU time and memory growth, and exports them as a JSON file and
+a Prometheus text-format file suitable for the node exporter textfile
+collector.
+
+Environment variables:
+    ORG_METRICS          - Set to 0 to skip writing metrics files
+    ORG_METRICS_DIR      - Directory for metrics files (default: ./metrics)
+    ORG_PROFILE_STAGES   - Comma-separated stage names to profile with
+                           cProfile and tracemalloc, or "all"
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import org_json
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEFAULT_METRICS_DIR = SCRIPT_DIR / 'metrics'
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'org_graph'
+
+
+def _peak_rss_bytes():
+    """Return the process peak resident set size in bytes, or 0 if unknown."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+def _current_rss_bytes():
+    """Return the current resident set size in bytes, or 0 if unknown."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _profile_stages_from_env():
+    """Parse ORG_PROFILE_STAGES into a set of stage names."""
+    value = os.environ.get('ORG_PROFILE_STAGES', '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class MetricsRecorder:
+    """Collects request and stage metrics for a single script run."""
+
+    def __init__(self, job, metrics_dir=None, profile_stages=None):
+        """
+        Create a recorder.
+
+        Args:
+            job: Job name used for file names and the Prometheus `job` label
+            metrics_dir: Output directory (defaults to ORG_METRICS_DIR or ./metrics)
+            profile_stages: Stage names to profile (defaults to ORG_PROFILE_STAGES)
+        """
+        self.job = job
+        self.metrics_dir = Path(metrics_dir or os.environ.get('ORG_METRICS_DIR') or DEFAULT_METRICS_DIR)
+        self.profile_stages = _profile_stages_from_env() if profile_stages is None else set(profile_stages)
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = {}
+        self.requests = {
+            'count': 0,
+            'errors': 0,
+            'latency_sum_seconds': 0.0,
+            'latency_max_seconds': 0.0,
+            'buckets': [0] * len(LATENCY_BUCKETS),
+            'response_bytes': 0,
+        }
+        self.graphql = {
+            'cost_total': 0,
+            'rate_limit_remaining': None,
+            'rate_limit_limit': None,
+            'rate_limit_reset_at': None,
+        }
+
+    def _should_profile(self, name):
+        """Return True if profiling hooks are enabled for a stage."""
+        return 'all' in self.profile_stages or name in self.profile_stages
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a named pipeline stage.
+
+        Records wall time, CPU time and the memory attributable to the stage:
+        how far it raised the process peak RSS and how much resident memory
+        it retained (current RSS at the end minus at the start). When the
+        stage is listed in ORG_PROFILE_STAGES, the stage's own tracemalloc
+        peak is recorded too, and a cProfile dump and a tracemalloc
+        top-allocations report are written next to the metrics files.
+
+        Args:
+            name: Stage name (e.g. "fetch", "process", "render")
+        """
+        profiler = None
+        profiling = self._should_profile(name)
+        started_tracing = False
+        if profiling:
+            import cProfile
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            traced_start, _ = tracemalloc.get_traced_memory()
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        peak_start = _peak_rss_bytes()
+        rss_start = _current_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            record = self.stages.setdefault(name, {
+                'calls': 0,
+                'wall_seconds': 0.0,
+                'cpu_seconds': 0.0,
+                'peak_rss_growth_bytes': 0,
+                'rss_delta_bytes': 0,
+            })
+            record['calls'] += 1
+            record['wall_seconds'] += wall
+            record['cpu_seconds'] += cpu
+            record['peak_rss_growth_bytes'] = max(record['peak_rss_growth_bytes'], _peak_rss_bytes() - peak_start)
+            if rss_start:
+                record['rss_delta_bytes'] += _current_rss_bytes() - rss_start
+
+            if profiling:
+                profiler.disable()
+                _, traced_peak = tracemalloc.get_traced_memory()
+                record['traced_peak_bytes'] = max(record.get('traced_peak_bytes', 0), traced_peak - traced_start)
+                self._write_profile(name, profiler, tracemalloc.take_snapshot())
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def _write_profile(self, name, profiler, snapshot):
+        """Write cProfile and tracemalloc reports for a stage."""
+        import pstats
+
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        prof_path = self.metrics_dir / f'{self.job}.{name}.prof'
+        profiler.dump_stats(prof_path)
+
+        top_path = self.metrics_dir / f'{self.job}.{name}.tracemalloc.txt'
+        with open(top_path, 'w', encoding='utf-8') as f:
+            f.write(f"Top allocations for stage '{name}'\n")
+            for stat in snapshot.statistics('lineno')[:25]:
+                f.write(f"{stat}\n")
+            f.write("\nTop functions by cumulative time\n")
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(25)
+
+    def observe_request(self, latency, response_bytes=0, error=False):
+        """
+        Record a single HTTP request.
+
+        Args:
+            latency: Request latency in seconds
+            response_bytes: Size of the response body
+            error: Whether the request failed
+        """
+        req = self.requests
+        req['count'] += 1
+        req['latency_sum_seconds'] += latency
+        req['latency_max_seconds'] = max(req['latency_max_seconds'], latency)
+        req['response_bytes'] += response_bytes
+        if error:
+            req['errors'] += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                req['buckets'][i] += 1
+                break
+
+    def observe_rate_limit(self, rate_limit):
+        """
+        Record the `rateLimit` object returned by a GraphQL response.
+
+        Args:
+            rate_limit: Dict with `cost`, `remaining`, `limit` and `resetAt`, or None
+        """
+        if not rate_limit:
+            return
+        self.graphql['cost_total'] += rate_limit.get('cost') or 0
+        self.graphql['rate_limit_remaining'] = rate_limit.get('remaining')
+        self.graphql['rate_limit_limit'] = rate_limit.get('limit')
+        self.graphql['rate_limit_reset_at'] = rate_limit.get('resetAt')
+
+    def to_dict(self):
+        """Return all recorded metrics as a JSON-serializable dictionary."""
+        req = self.requests
+        cumulative = []
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, req['buckets']):
+            running += count
+            cumulative.append({'le': bound, 'count': running})
+        return {
+            'job': self.job,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'peak_rss_bytes': _peak_rss_bytes(),
+            'stages': self.stages,
+            'requests': {
+                'count': req['count'],
+                'errors': req['errors'],
+                'latency_sum_seconds': req['latency_sum_seconds'],
+                'latency_max_seconds': req['latency_max_seconds'],
+                'response_bytes': req['response_bytes'],
+                'latency_histogram': cumulative,
+            },
+            'graphql': self.graphql,
+        }
+
+    def to_prometheus(self):
+        """Render all recorded metrics in Prometheus text exposition format."""
+        job = self.job
+        p = METRIC_PREFIX
+        req = self.requests
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+
+        metric('request_latency_seconds', 'histogram', 'GitHub API request latency.')
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, req['buckets']):
+            running += count
+            lines.append(f'{p}_request_latency_seconds_bucket{{job="{job}",le="{bound}"}} {running}')
+        lines.append(f'{p}_request_latency_seconds_bucket{{job="{job}",le="+Inf"}} {req["count"]}')
+        lines.append(f'{p}_request_latency_seconds_sum{{job="{job}"}} {req["latency_sum_seconds"]:.6f}')
+        lines.append(f'{p}_request_latency_seconds_count{{job="{job}"}} {req["count"]}')
+
+        metric('request_errors_total', 'counter', 'Failed GitHub API requests.')
+        lines.append(f'{p}_request_errors_total{{job="{job}"}} {req["errors"]}')
+        metric('response_bytes_total', 'counter', 'Bytes received from the GitHub API.')
+        lines.append(f'{p}_response_bytes_total{{job="{job}"}} {req["response_bytes"]}')
+
+        metric('graphql_cost_total', 'counter', 'Sum of GraphQL rateLimit.cost for this run.')
+        lines.append(f'{p}_graphql_cost_total{{job="{job}"}} {self.graphql["cost_total"]}')
+        if self.graphql['rate_limit_remaining'] is not None:
+            metric('graphql_rate_limit_remaining', 'gauge', 'GraphQL rate-limit points remaining.')
+            lines.append(f'{p}_graphql_rate_limit_remaining{{job="{job}"}} {self.graphql["rate_limit_remaining"]}')
+
+        metric('stage_wall_seconds', 'gauge', 'Wall-clock time spent in a pipeline stage.')
+        for name, record in self.stages.items():
+            lines.append(f'{p}_stage_wall_seconds{{job="{job}",stage="{name}"}} {record["wall_seconds"]:.6f}')
+        metric('stage_cpu_seconds', 'gauge', 'CPU time spent in a pipeline stage.')
+        for name, record in self.stages.items():
+            lines.append(f'{p}_stage_cpu_seconds{{job="{job}",stage="{name}"}} {record["cpu_seconds"]:.6f}')
+        metric('stage_peak_rss_growth_bytes', 'gauge', 'Increase of the process peak RSS during a pipeline stage.')
+        for name, record in self.stages.items():
+            lines.append(f'{p}_stage_peak_rss_growth_bytes{{job="{job}",stage="{name}"}} '
+                         f'{record["peak_rss_growth_bytes"]}')
+        metric('stage_rss_delta_bytes', 'gauge', 'Resident memory retained by a pipeline stage.')
+        for name, record in self.stages.items():
+            lines.append(f'{p}_stage_rss_delta_bytes{{job="{job}",stage="{name}"}} {record["rss_delta_bytes"]}')
+        traced = {name: record['traced_peak_bytes'] for name, record in self.stages.items()
+                  if 'traced_peak_bytes' in record}
+        if traced:
+            metric('stage_traced_peak_bytes', 'gauge', 'Peak Python allocations during a profiled pipeline stage.')
+            for name, peak in traced.items():
+                lines.append(f'{p}_stage_traced_peak_bytes{{job="{job}",stage="{name}"}} {peak}')
+
+        metric('peak_rss_bytes', 'gauge', 'Process peak resident set size.')
+        lines.append(f'{p}_peak_rss_bytes{{job="{job}"}} {_peak_rss_bytes()}')
+        metric('last_run_timestamp_seconds', 'gauge', 'Unix time at which the run finished.')
+        lines.append(f'{p}_last_run_timestamp_seconds{{job="{job}"}} {time.time():.0f}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """
+        Write `<job>.json` and `<job>.prom` into the metrics directory.
+
+        Files are written to a temporary name and renamed so that a scraping
+        node exporter never sees a partial file.
+
+        Returns:
+            Tuple of (json_path, prom_path), or None if metrics are disabled
+        """
+        if os.environ.get('ORG_METRICS', '1') == '0':
+            return None
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        json_path = self.metrics_dir / f'{self.job}.json'
+        prom_path = self.metrics_dir / f'{self.job}.prom'
+
+        _write_atomic(json_path, org_json.dumps(self.to_dict(), pretty=True).decode('utf-8') + "\n")
+        _write_atomic(prom_path, self.to_prometheus())
+        return json_path, prom_path
+
+
+def _write_atomic(path, text):
+    """Write text to path via a temporary file and rename."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
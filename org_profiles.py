@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Profiles
+Repository categories and per-organization categorization rules.
+
+Organization-specific knowledge (category membership lists, the shared
+repository name prefix, category descriptions) lives in
+`profiles/<login>.json` rather than in code. Organizations without a profile
+are categorized by keywords in their repository names.
+
+Profile format:
+    {
+      "prefix": "cog",
+      "fork_note": "Pygmalion AI related",
+      "descriptions": {"core_libraries": "..."},
+      "categories": {"core_libraries": ["cogpy", ...], ...}
+    }
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import org_json
+
+# Get script directory for relative paths
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROFILE_DIR = SCRIPT_DIR / 'profiles'
+
+# Repository categories in report order:
+# (key, display name, default strategic importance, default description)
+CATEGORIES = (
+    ('core_libraries', 'Core Libraries', 'critical', 'Core libraries and foundational implementations'),
+    ('infrastructure', 'Infrastructure', 'critical', 'DevOps, monitoring, and configuration management'),
+    ('tools_cli', 'Tools & CLI', 'medium', 'Command-line interfaces and developer tools'),
+    ('web_api', 'Web & API', 'high', 'Web interfaces and API services'),
+    ('data_models', 'Data & Models', 'high', 'Data processing, model training, and evaluation'),
+    ('documentation', 'Documentation', 'high', 'Documentation, research papers, and assets'),
+    ('testing_benchmarking', 'Testing & Benchmarking', 'critical', 'Quality assurance and performance testing'),
+    ('deployment_cloud', 'Deployment & Cloud', 'high', 'Cloud deployment and orchestration'),
+    ('experimental', 'Experimental', 'low', 'Prototypes and experimental features'),
+    ('integrations', 'Integrations', 'high', 'Third-party integrations and connectors'),
+    ('mobile_desktop', 'Mobile & Desktop', 'medium', 'Native applications'),
+    ('forked_projects', 'Forked Projects', 'medium', 'Forks of upstream projects'),
+    ('organization', 'Organization', 'medium', 'Organization meta-repository'),
+)
+CATEGORY_DISPLAY_NAMES = {key: display for key, display, _, _ in CATEGORIES}
+
+# Name keywords used when an organization has no profile. Each pattern is
+# matched against the start of every name segment (split on '-', '_', '.'),
+# after the profile prefix has been removed.
+CATEGORY_KEYWORDS = (
+    ('documentation', r'docs?$|paper|research|notebook|example|asset|media|brand|archive|legacy|viz$'),
+    ('testing_benchmarking', r'bench|tests?$|testing'),
+    ('infrastructure', r'infra|ci$|monitor|config|ops$|devops'),
+    ('deployment_cloud', r'cloud|deploy|k8s|helm|terraform'),
+    ('tools_cli', r'cli$|tools?$|scripts?$'),
+    ('web_api', r'web|apis?$|server?$|site$'),
+    ('data_models', r'data|models?$|learn|train|eval$|dataset'),
+    ('integrations', r'integration|connector|adapter|bridge|sdk$|client|plugin|extension'),
+    ('mobile_desktop', r'mobile|desktop|android|ios$'),
+    ('experimental', r'exp$|experiment|proto|sandbox|playground|poc$'),
+    ('core_libraries', r'core$|lib'),
+)
+_KEYWORD_PATTERNS = tuple((key, re.compile(pattern)) for key, pattern in CATEGORY_KEYWORDS)
+_NAME_SEGMENT = re.compile(r'[-_.]')
+
+
+@lru_cache(maxsize=None)
+def load_profile(login, profile_dir=PROFILE_DIR):
+    """
+    Load the profile of an organization.
+
+    Args:
+        login: Organization login (None or unknown logins get an empty profile)
+        profile_dir: Directory containing <login>.json profiles
+
+    Returns:
+        Profile dictionary (empty if the organization has no profile)
+    """
+    if not login:
+        return {}
+    try:
+        return org_json.load(Path(profile_dir) / f'{login.lower()}.json')
+    except FileNotFoundError:
+        return {}
+
+
+def category_description(key, profile):
+    """Return the description of a category, preferring the profile's wording."""
+    descriptions = profile.get('descriptions', {})
+    return descriptions.get(key) or next(desc for k, _, _, desc in CATEGORIES if k == key)
+
+
+def _keyword_category(name, prefix):
+    """Return the category whose keywords match a repository name, or None."""
+    name = name.lower()
+    if prefix and name.startswith(prefix) and len(name) > len(prefix):
+        name = name[len(prefix):]
+    segments = [segment for segment in _NAME_SEGMENT.split(name) if segment]
+    for key, pattern in _KEYWORD_PATTERNS:
+        if any(pattern.match(segment) for segment in segments):
+            return key
+    return None
+
+
+class RepositoryCategorizer:
+    """
+    Callable (name, is_fork) -> category key or None for one organization.
+
+    Forks always go to `forked_projects` and the organization's meta
+    repository (`org-<login>`, `.github` or `<login>`) to `organization`.
+    Other repositories use the profile's membership lists when the profile has
+    them, and name keywords otherwise.
+
+    The login can be given directly or read from an organization mapping on
+    first use, so the categorizer can be created before a SnapshotStream has
+    read the organization fields.
+    """
+
+    def __init__(self, login=None, organization=None, profile_dir=PROFILE_DIR):
+        self._login = login
+        self._organization = organization
+        self._profile_dir = profile_dir
+        self._rules = None
+
+    @property
+    def login(self):
+        """Organization login, if known."""
+        if self._login is None and self._organization is not None:
+            return self._organization.get('login')
+        return self._login
+
+    @property
+    def profile(self):
+        """Profile of the organization (empty if it has none)."""
+        return load_profile(self.login, self._profile_dir)
+
+    def _build_rules(self):
+        """Resolve the profile into (meta repository names, name -> category, prefix)."""
+        login = self.login or ''
+        profile = self.profile
+        meta_names = {f'org-{login}', '.github', login} if login else {'.github'}
+        members = {}
+        for key, names in profile.get('categories', {}).items():
+            for name in names:
+                members.setdefault(name, key)
+        return meta_names, members, profile.get('prefix', '').lower()
+
+    def __call__(self, name, is_fork):
+        if self._rules is None:
+            self._rules = self._build_rules()
+        meta_names, members, prefix = self._rules
+        if is_fork:
+            return 'forked_projects'
+        if name in meta_names:
+            return 'organization'
+        if members:
+            return members.get(name)
+        return _keyword_category(name, prefix)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+O9NN Organization Snapshot Streaming
+Iterates over repository nodes of an org-graph-raw.json snapshot without
+loading the whole document.
+
+The snapshot file is memory-mapped and scanned with an event-style tokenizer
+that walks down `data.organization.repositories.nodes`. Each repository node
+is decoded on its own, so memory use is bounded by the largest single node
+rather than the size of the file. Nodes are decoded with the stdlib
+`raw_decode` over a read window, not org_json: orjson would need each node's
+end found by a separate scan first, which makes it about 6x slower here.
+"""
+
+import codecs
+import heapq
+import json
+import mmap
+import re
+from datetime import datetime
+
+# Path from the document root to the repository node array
+NODES_PATH = ('data', 'organization', 'repositories', 'nodes')
+
+_WS = re.compile(rb'\s*')
+_KEY = re.compile(rb'\s*"((?:[^"\\]|\\.)*)"\s*:\s*', re.DOTALL)
+_SEPARATOR = re.compile(rb'\s*([,}\]])')
+_SCALAR = re.compile(rb'"(?:[^"\\]|\\.)*"|-?[0-9][0-9.eE+-]*|true|false|null', re.DOTALL)
+# Tokens that matter for finding the end of a container: strings (skipped
+# whole so brackets inside them are ignored) and brackets
+_STRUCTURE = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+
+# Initial number of bytes decoded per repository node; doubled as needed
+NODE_WINDOW = 16 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a snapshot does not have the expected structure."""
+
+
+class _HeaderComplete(Exception):
+    """Stops a header-only walk once the required organization fields are known."""
+
+
+def _skip_value(buf, pos):
+    """Return the offset just past the JSON value starting at pos."""
+    pos = _WS.match(buf, pos).end()
+    opener = buf[pos:pos + 1]
+    if opener not in (b'{', b'['):
+        match = _SCALAR.match(buf, pos)
+        if not match:
+            raise SnapshotFormatError(f"Invalid JSON value at offset {pos}")
+        return match.end()
+
+    depth = 0
+    for match in _STRUCTURE.finditer(buf, pos):
+        token = match.group()
+        if token in (b'{', b'['):
+            depth += 1
+        elif token in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise SnapshotFormatError(f"Unterminated JSON container at offset {pos}")
+
+
+def _decode(buf, start, end):
+    """Decode the JSON value in buf[start:end]."""
+    return json.loads(buf[start:end])
+
+
+def _decode_node(buf, start):
+    """
+    Decode the JSON value starting at start, growing the read window as needed.
+
+    Returns:
+        Tuple of (decoded value, offset just past the value)
+    """
+    window = NODE_WINDOW
+    size = len(buf)
+    while True:
+        chunk = buf[start:start + window]
+        # Incremental decoding leaves a multi-byte character cut at the window edge undecoded
+        text = codecs.getincrementaldecoder('utf-8')().decode(chunk, final=start + window >= size)
+        try:
+            value, index = _decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            if start + window >= size:
+                raise
+            window *= 2
+            continue
+        if len(text) == len(chunk) and text.isascii():
+            return value, start + index
+        return value, start + len(text[:index].encode('utf-8'))
+
+
+def _exhaust(generator):
+    """Run a generator to completion and return its return value."""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _expect(buf, pos, char):
+    """Skip whitespace and require the given structural character."""
+    pos = _WS.match(buf, pos).end()
+    if buf[pos:pos + 1] != char:
+        raise SnapshotFormatError(f"Expected {char.decode()!r} at offset {pos}")
+    return pos + 1
+
+
+def _iter_members(buf, pos):
+    """
+    Iterate over the members of the JSON object starting at pos.
+
+    Yields (key, value_start) pairs. The consumer must send back the offset
+    just past the value before the next member is read.
+    """
+    pos = _expect(buf, pos, b'{')
+    sep = _SEPARATOR.match(buf, pos)
+    if sep and sep.group(1) == b'}':
+        return sep.end()
+    while True:
+        match = _KEY.match(buf, pos)
+        if not match:
+            raise SnapshotFormatError(f"Expected object key at offset {pos}")
+        key = json.loads(b'"' + match.group(1) + b'"')
+        pos = yield key, match.end()
+        sep = _SEPARATOR.match(buf, pos)
+        if not sep or sep.group(1) == b']':
+            raise SnapshotFormatError(f"Expected ',' or '}}' at offset {pos}")
+        pos = sep.end()
+        if sep.group(1) == b'}':
+            return pos
+
+
+class SnapshotStream:
+    """
+    Single-pass iterator over the repository nodes of a snapshot file.
+
+    Iterating yields each repository node dictionary. The `organization`
+    attribute holds the organization fields (everything except
+    `repositories.nodes`); fields that appear before the node array in the
+    file are available as soon as the first node is yielded, the rest once
+    iteration has finished.
+    """
+
+    def __init__(self, filepath):
+        """
+        Open a snapshot for streaming.
+
+        Args:
+            filepath: Path to an org-graph-raw.json snapshot
+        """
+        self.filepath = filepath
+        self.organization = {'repositories': {}}
+        self._consumed = False
+        # Dotted field paths that end a header-only walk (see read_organization)
+        self._header_fields = None
+
+    def _open(self):
+        """Mark the stream consumed and return the open snapshot file."""
+        if self._consumed:
+            raise RuntimeError("SnapshotStream can only be iterated once")
+        self._consumed = True
+        f = open(self.filepath, 'rb')
+        if f.seek(0, 2) == 0:
+            f.close()
+            raise SnapshotFormatError(f"Empty snapshot file: {self.filepath}")
+        return f
+
+    def __iter__(self):
+        with self._open() as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                yield from self._walk(buf, 0, 0)
+
+    def _has_field(self, path):
+        """Return True if a dotted organization field path has been read."""
+        value = self.organization
+        for part in path.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return False
+            value = value[part]
+        return True
+
+    def read_organization(self, required=()):
+        """
+        Read the organization fields without decoding any repository node.
+
+        Reading stops at the repository node array when every required field
+        has been read by then (fields written before the array, as the
+        fetcher does); otherwise the array is skipped unparsed and the fields
+        after it are read too.
+
+        Args:
+            required: Dotted field paths (e.g. "repositories.totalCount")
+
+        Returns:
+            Organization fields (without `repositories.nodes`)
+        """
+        self._header_fields = tuple(required)
+        with self._open() as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                try:
+                    for _ in self._walk(buf, 0, 0):
+                        pass
+                except _HeaderComplete:
+                    pass
+        return self.organization
+
+    def _walk(self, buf, pos, level):
+        """Descend along NODES_PATH, collecting organization fields on the way."""
+        found = False
+        members = _iter_members(buf, pos)
+        try:
+            key, value_start = next(members)
+            while True:
+                end = None
+                if key == NODES_PATH[level]:
+                    found = True
+                    if level + 1 < len(NODES_PATH):
+                        end = yield from self._walk(buf, value_start, level + 1)
+                    elif self._header_fields is not None:
+                        if all(self._has_field(path) for path in self._header_fields):
+                            raise _HeaderComplete
+                        # Decoding the nodes is faster than scanning them token by token
+                        end = _exhaust(self._iter_nodes(buf, value_start))
+                    else:
+                        end = yield from self._iter_nodes(buf, value_start)
+                else:
+                    end = _skip_value(buf, value_start)
+                    if level == 3:
+                        self.organization['repositories'][key] = _decode(buf, value_start, end)
+                    elif level == 2:
+                        self.organization[key] = _decode(buf, value_start, end)
+                key, value_start = members.send(end)
+        except StopIteration as stop:
+            if not found:
+                raise SnapshotFormatError(f"Missing key: {NODES_PATH[level]}")
+            return stop.value
+
+    def _iter_nodes(self, buf, pos):
+        """Yield each element of the JSON array starting at pos."""
+        pos = _expect(buf, pos, b'[')
+        sep = _SEPARATOR.match(buf, pos)
+        if sep and sep.group(1) == b']':
+            return sep.end()
+        while True:
+            start = _WS.match(buf, pos).end()
+            node, end = _decode_node(buf, start)
+            yield node
+            sep = _SEPARATOR.match(buf, end)
+            if not sep or sep.group(1) == b'}':
+                raise SnapshotFormatError(f"Expected ',' or ']' at offset {end}")
+            pos = sep.end()
+            if sep.group(1) == b']':
+                return pos
+
+
+# Aggregates computed by summarize_repositories
+AGGREGATES = ('languages', 'health', 'categories', 'activity')
+
+
+def summarize_repositories(repos, categorize=None, now=None, recent_days=30, recent_limit=10,
+                           aggregates=AGGREGATES):
+    """
+    Aggregate repository statistics in a single pass.
+
+    Only counters, category name lists and a bounded heap of recently
+    updated repositories are kept, so the input can be a stream.
+
+    Args:
+        repos: Iterable of repository node dictionaries
+        categorize: Optional function (name, is_fork) -> category name or None
+        now: Reference time for recent activity (defaults to datetime.now())
+        recent_days: Age limit in days for recent activity
+        recent_limit: Maximum number of recent repositories to keep
+        aggregates: Subset of AGGREGATES to compute; the others stay empty
+
+    Returns:
+        Dictionary of aggregated statistics
+    """
+    now = now or datetime.now()
+    summary = {
+        'total': 0,
+        'language_counts': {},
+        'with_description': 0,
+        'forked': 0,
+        'archived': 0,
+        'private': 0,
+        'categories': {},
+        'recent': [],
+    }
+    language_counts = summary['language_counts']
+    categories = summary['categories']
+    # Max-heap (via negated keys) of the most recently updated repositories
+    recent_heap = []
+
+    do_languages = 'languages' in aggregates
+    do_health = 'health' in aggregates
+    do_activity = 'activity' in aggregates
+    if 'categories' not in aggregates:
+        categorize = None
+
+    for index, repo in enumerate(repos):
+        summary['total'] += 1
+
+        if do_languages and repo.get('primaryLanguage'):
+            lang = repo['primaryLanguage']['name']
+            language_counts[lang] = language_counts.get(lang, 0) + 1
+
+        if do_health:
+            if repo.get('description'):
+                summary['with_description'] += 1
+            if repo.get('isFork', False):
+                summary['forked'] += 1
+            if repo.get('isArchived', False):
+                summary['archived'] += 1
+            if repo.get('isPrivate', False):
+                summary['private'] += 1
+
+        if categorize:
+            name = repo.get('name', '')
+            category = categorize(name, repo.get('isFork', False))
+            if category:
+                categories.setdefault(category, []).append(name)
+
+        updated_at = repo.get('updatedAt') if do_activity else None
+        if updated_at:
+            try:
+                updated = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
+            except (ValueError, AttributeError):
+                continue
+            days_ago = (now - updated.replace(tzinfo=None)).days
+            if days_ago <= recent_days:
+                entry = (-days_ago, -index, repo.get('name', 'Unknown'))
+                if len(recent_heap) < recent_limit:
+                    heapq.heappush(recent_heap, entry)
+                elif entry > recent_heap[0]:
+                    heapq.heapreplace(recent_heap, entry)
+
+    summary['recent'] = [(name, -neg_days) for neg_days, _, name in sorted(recent_heap, reverse=True)]
+    return summary
+
+
+def summarize_snapshot(filepath, categorize=None, now=None, aggregates=AGGREGATES, categorizer=None,
+                       required_fields=()):
+    """
+    Stream a snapshot file and aggregate its repositories in one pass.
+
+    When no aggregate is requested, no repository node is decoded: only the
+    organization fields are read and the total comes from
+    `repositories.totalCount`.
+
+    Args:
+        filepath: Path to an org-graph-raw.json snapshot
+        categorize: Optional function (name, is_fork) -> category name or None
+        now: Reference time for recent activity
+        aggregates: Subset of AGGREGATES to compute
+        categorizer: Optional factory called with the stream's organization
+            fields (filled in while streaming) that returns a categorize
+            function; used instead of `categorize`
+        required_fields: Dotted organization field paths the caller needs
+            when no aggregate is requested (see SnapshotStream.read_organization)
+
+    Returns:
+        Tuple of (organization fields, summary dictionary)
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+        SnapshotFormatError: If the snapshot is malformed
+    """
+    if not aggregates:
+        organization = SnapshotStream(filepath).read_organization(
+            ('repositories.totalCount',) + tuple(required_fields))
+        total = organization['repositories'].get('totalCount')
+        if isinstance(total, int):
+            summary = summarize_repositories((), aggregates=())
+            summary['total'] = total
+            return organization, summary
+
+    stream = SnapshotStream(filepath)
+    if categorizer is not None:
+        categorize = categorizer(stream.organization)
+    try:
+        summary = summarize_repositories(stream, categorize=categorize, now=now, aggregates=aggregates)
+    except json.JSONDecodeError as e:
+        raise SnapshotFormatError(f"Invalid repository node: {e}") from e
+    return stream.organization, summary
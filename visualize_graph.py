@@ -4,13 +4,13 @@ O9NN Organization Graph Visualization Script
 Creates visual representations of organization structure and metrics.
 """
 
-import json
+import argparse
 import sys
 from pathlib import Path
-from collections import defaultdict
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+from org_metrics import MetricsRecorder
+from org_profiles import CATEGORY_DISPLAY_NAMES, RepositoryCategorizer
+from org_stream import SnapshotFormatError, summarize_snapshot
 
 # Get script directory for relative paths
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -19,16 +19,20 @@ OUTPUT_VISUALIZATION = SCRIPT_DIR / 'org-graph-visualization.png'
 OUTPUT_NETWORK = SCRIPT_DIR / 'org-graph-network.png'
 
 
-def load_organization_data(filepath):
-    """Load organization data from JSON file."""
+def load_organization_summary(filepath):
+    """
+    Stream organization data from a JSON file and aggregate it in one pass.
+
+    Returns:
+        Tuple of (organization fields, summary dictionary)
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        return summarize_snapshot(filepath, aggregates=('categories', 'health', 'languages'),
+                                  categorizer=lambda organization: RepositoryCategorizer(organization=organization))
     except FileNotFoundError:
         print(f"Error: File not found: {filepath}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except SnapshotFormatError as e:
         print(f"Error: Invalid JSON in {filepath}: {e}")
         sys.exit(1)
     except Exception as e:
@@ -36,19 +40,22 @@ def load_organization_data(filepath):
         sys.exit(1)
 
 
-def create_visualizations(data):
-    """Create comprehensive visualizations of organization data."""
-    try:
-        repos = data['data']['organization']['repositories']['nodes']
-    except KeyError as e:
-        print(f"Error: Missing expected key in data structure: {e}")
-        sys.exit(1)
+def render_visualizations(org, summary):
+    """
+    Render the dashboard and network graph from aggregated statistics.
+
+    Args:
+        org: Organization fields (repository nodes are not needed)
+        summary: Aggregated statistics from summarize_repositories
+    """
+    # Imported here so that loading this module stays cheap
+    import matplotlib.pyplot as plt
+
+    total = summary['total']
+    org_name = (org.get('login') or 'organization').upper()
 
     # Language distribution
-    language_counts = defaultdict(int)
-    for repo in repos:
-        if repo.get('primaryLanguage'):
-            language_counts[repo['primaryLanguage']['name']] += 1
+    language_counts = summary['language_counts']
 
     # Get top 10 languages
     sorted_langs = sorted(language_counts.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -72,23 +79,9 @@ def create_visualizations(data):
 
     # 2. Repository Categories Bar Chart
     ax2 = plt.subplot(2, 2, 2)
-    categories = {
-        'Core Libraries': 13,
-        'Infrastructure': 5,
-        'Tools & CLI': 3,
-        'Web & API': 3,
-        'Data & Models': 5,
-        'Documentation': 11,
-        'Testing': 2,
-        'Deployment': 1,
-        'Experimental': 4,
-        'Integrations': 8,
-        'Mobile/Desktop': 2,
-        'Forked': 9,
-        'Organization': 1
-    }
+    categories = {key: len(summary['categories'].get(key, ())) for key in CATEGORY_DISPLAY_NAMES}
 
-    cat_names = list(categories.keys())
+    cat_names = [CATEGORY_DISPLAY_NAMES[key] for key in categories]
     cat_counts = list(categories.values())
     colors_bar = plt.cm.tab20(range(len(cat_names)))
 
@@ -107,12 +100,12 @@ def create_visualizations(data):
     ax3 = plt.subplot(2, 2, 3)
     
     # Calculate actual metrics
-    repos_with_desc = sum(1 for r in repos if r.get('description'))
-    repos_without_desc = len(repos) - repos_with_desc
-    original_repos = sum(1 for r in repos if not r.get('isFork', False))
-    forked_repos = len(repos) - original_repos
-    private_repos = sum(1 for r in repos if r.get('isPrivate', False))
-    public_repos = len(repos) - private_repos
+    repos_with_desc = summary['with_description']
+    repos_without_desc = total - repos_with_desc
+    forked_repos = summary['forked']
+    original_repos = total - forked_repos
+    private_repos = summary['private']
+    public_repos = total - private_repos
     
     health_metrics = {
         'With Description': repos_with_desc,
@@ -144,21 +137,24 @@ def create_visualizations(data):
     ax4 = plt.subplot(2, 2, 4)
     ax4.axis('off')
 
-    desc_percentage = (repos_with_desc / len(repos) * 100) if repos else 0
+    desc_percentage = (repos_with_desc / total * 100) if total else 0
+    top_language, top_count = sorted_langs[0] if sorted_langs else ('No', 0)
+    categorized = sum(1 for count in categories.values() if count)
+    operations = categories['infrastructure'] + categories['testing_benchmarking'] + categories['deployment_cloud']
     
     overview_text = f"""
-O9NN ORGANIZATION OVERVIEW
+{org_name} ORGANIZATION OVERVIEW
 
-Total Repositories: {len(repos)}
-Total Members: {data['data']['organization']['membersWithRole'].get('totalCount', 0)}
-Created: {data['data']['organization'].get('createdAt', 'N/A')[:10]}
+Total Repositories: {total}
+Total Members: {org['membersWithRole'].get('totalCount', 0)}
+Created: {org.get('createdAt', 'N/A')[:10]}
 
 KEY INSIGHTS:
 
-✓ Strong Python ecosystem ({language_counts.get('Python', 0)} repos)
+✓ Largest ecosystem: {top_language} ({top_count} repos)
 ✓ Multi-language support ({len(language_counts)} languages)
-✓ Modular architecture with clear separation
-✓ Comprehensive tooling and infrastructure
+✓ Repositories in {categorized} of {len(categories)} categories
+✓ {operations} infrastructure, testing and deployment repos
 
 AREAS FOR IMPROVEMENT:
 
@@ -181,7 +177,7 @@ RECOMMENDATIONS:
              fontsize=10, verticalalignment='top', fontfamily='monospace',
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
 
-    plt.suptitle('O9NN Organization Graph Analysis', fontsize=18, fontweight='bold', y=0.98)
+    plt.suptitle(f'{org_name} Organization Graph Analysis', fontsize=18, fontweight='bold', y=0.98)
     plt.tight_layout(rect=[0, 0, 1, 0.96])
 
     # Save the figure
@@ -189,12 +185,16 @@ RECOMMENDATIONS:
     print(f"Visualization saved to: {OUTPUT_VISUALIZATION}")
 
     # Create a network-style graph showing relationships
-    create_network_graph(categories)
+    create_network_graph(categories, org_name)
 
 
-def create_network_graph(categories):
+def create_network_graph(categories, org_name='ORGANIZATION'):
     """Create network-style visualization of repository categories."""
     import math
+    import textwrap
+
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
     
     fig2, ax = plt.subplots(figsize=(16, 12))
     ax.set_xlim(-10, 10)
@@ -203,41 +203,41 @@ def create_network_graph(categories):
 
     # Define category positions in a circular layout
     category_positions = {
-        'Core Libraries': (0, 6),
-        'Infrastructure': (5, 4),
-        'Tools & CLI': (7, 0),
-        'Web & API': (5, -4),
-        'Data & Models': (0, -6),
-        'Documentation': (-5, -4),
-        'Testing': (-7, 0),
-        'Deployment': (-5, 4),
-        'Experimental': (-3, 7),
-        'Integrations': (3, 7),
-        'Mobile/Desktop': (8, 2),
-        'Forked': (8, -2),
-        'Organization': (0, 0)
+        'core_libraries': (0, 6),
+        'infrastructure': (5, 4),
+        'tools_cli': (7, 0),
+        'web_api': (5, -4),
+        'data_models': (0, -6),
+        'documentation': (-5, -4),
+        'testing_benchmarking': (-7, 0),
+        'deployment_cloud': (-5, 4),
+        'experimental': (-3, 7),
+        'integrations': (3, 7),
+        'mobile_desktop': (8, 2),
+        'forked_projects': (8, -2),
+        'organization': (0, 0)
     }
 
     category_colors = {
-        'Core Libraries': '#e74c3c',
-        'Infrastructure': '#3498db',
-        'Tools & CLI': '#2ecc71',
-        'Web & API': '#9b59b6',
-        'Data & Models': '#f39c12',
-        'Documentation': '#1abc9c',
-        'Testing': '#34495e',
-        'Deployment': '#16a085',
-        'Experimental': '#e67e22',
-        'Integrations': '#8e44ad',
-        'Mobile/Desktop': '#27ae60',
-        'Forked': '#95a5a6',
-        'Organization': '#c0392b'
+        'core_libraries': '#e74c3c',
+        'infrastructure': '#3498db',
+        'tools_cli': '#2ecc71',
+        'web_api': '#9b59b6',
+        'data_models': '#f39c12',
+        'documentation': '#1abc9c',
+        'testing_benchmarking': '#34495e',
+        'deployment_cloud': '#16a085',
+        'experimental': '#e67e22',
+        'integrations': '#8e44ad',
+        'mobile_desktop': '#27ae60',
+        'forked_projects': '#95a5a6',
+        'organization': '#c0392b'
     }
 
     # Draw connections from Organization to all categories
-    org_pos = category_positions['Organization']
+    org_pos = category_positions['organization']
     for cat, pos in category_positions.items():
-        if cat != 'Organization':
+        if cat != 'organization':
             ax.plot([org_pos[0], pos[0]], [org_pos[1], pos[1]], 
                     'k-', alpha=0.2, linewidth=1, zorder=1)
 
@@ -247,14 +247,16 @@ def create_network_graph(categories):
         size = 800 + count * 100
         circle = plt.Circle(pos, 0.8, color=category_colors[cat], alpha=0.7, zorder=2)
         ax.add_patch(circle)
-        ax.text(pos[0], pos[1], f'{cat}\n({count})', 
+        # Wrap long display names to fit inside the node
+        label = textwrap.fill(CATEGORY_DISPLAY_NAMES[cat], 12, break_long_words=False)
+        ax.text(pos[0], pos[1], f'{label}\n({count})', 
                 ha='center', va='center', fontsize=9, fontweight='bold',
                 color='white', zorder=3)
 
-    ax.set_title('O9NN Organization Repository Network', fontsize=18, fontweight='bold', pad=20)
+    ax.set_title(f'{org_name} Organization Repository Network', fontsize=18, fontweight='bold', pad=20)
 
     # Add legend
-    legend_elements = [mpatches.Patch(facecolor=color, label=cat, alpha=0.7) 
+    legend_elements = [mpatches.Patch(facecolor=color, label=CATEGORY_DISPLAY_NAMES[cat], alpha=0.7) 
                        for cat, color in category_colors.items()]
     ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1.02, 1), 
               fontsize=9, framealpha=0.9)
@@ -264,12 +266,24 @@ def create_network_graph(categories):
     print(f"Network graph saved to: {OUTPUT_NETWORK}")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Render organization graph visualizations.")
+    parser.add_argument('--input', type=Path, default=RAW_DATA_FILE, help="Snapshot to visualize")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
-    print(f"Loading organization data from: {RAW_DATA_FILE}")
-    data = load_organization_data(RAW_DATA_FILE)
+    args = parse_args(argv)
+    metrics = MetricsRecorder('visualize_graph')
+    print(f"Loading organization data from: {args.input}")
+    with metrics.stage('load_and_aggregate'):
+        org, summary = load_organization_summary(args.input)
     print("Creating visualizations...")
-    create_visualizations(data)
+    with metrics.stage('render'):
+        render_visualizations(org, summary)
+    metrics.write()
     print("\nVisualization complete!")
 
 